@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Configuration Module
+Loads API credentials, email settings and shared paths once per process
+"""
+
+import os
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+
+SCHWAB_CREDENTIALS_FILE = 'schwab_credentials.env'
+EMAIL_CREDENTIALS_FILE = 'email_credentials.env'
+
+
+def read_env_file(path: str) -> Dict[str, str]:
+    """
+    Parse a KEY=VALUE environment file, skipping blank lines and comments
+
+    Args:
+        path: Path to the environment file
+
+    Returns:
+        Dictionary of key/value pairs
+    """
+    values = {}
+    with open(path, 'r') as f:
+        for line in f:
+            line = line.strip()
+            if line and not line.startswith('#') and '=' in line:
+                key, value = line.split('=', 1)
+                values[key.strip()] = value.strip()
+    return values
+
+
+@dataclass(frozen=True, slots=True)
+class Config:
+    """Process-wide settings shared by all modular components"""
+    data_dir: str = "data"
+    api_base_url: str = "https://api.schwabapi.com"
+
+    # Schwab API credentials
+    schwab_app_key: Optional[str] = None
+    schwab_app_secret: Optional[str] = None
+
+    # Email notifications
+    email_config_found: bool = False
+    email_alerts_enabled: bool = False
+    sender_email: Optional[str] = None
+    sender_password: Optional[str] = None
+    to_emails: Tuple[str, ...] = ()
+    smtp_server: str = "smtp.gmail.com"
+    smtp_port: int = 587
+
+    @classmethod
+    def load(cls) -> 'Config':
+        """
+        Get the process-wide configuration, reading env files on first use only
+
+        Returns:
+            Shared Config instance
+        """
+        global _config
+        if _config is None:
+            _config = cls._from_environment()
+        return _config
+
+    @classmethod
+    def _from_environment(cls) -> 'Config':
+        """Build configuration from the credential files and os.environ"""
+        if os.path.exists(SCHWAB_CREDENTIALS_FILE):
+            try:
+                # Credentials file values take precedence over the environment
+                os.environ.update(read_env_file(SCHWAB_CREDENTIALS_FILE))
+            except Exception as e:
+                print(f"⚠️  Error loading credentials file: {e}")
+
+        email_settings = {}
+        email_config_found = os.path.exists(EMAIL_CREDENTIALS_FILE)
+        if email_config_found:
+            try:
+                email = read_env_file(EMAIL_CREDENTIALS_FILE)
+                email_settings = {
+                    'email_alerts_enabled': email.get('EMAIL_ALERTS_ENABLED', '').lower() == 'true',
+                    'sender_email': email.get('SENDER_EMAIL'),
+                    'sender_password': email.get('SENDER_PASSWORD'),
+                    'to_emails': tuple(e.strip() for e in email['TO_EMAILS'].split(',')) if 'TO_EMAILS' in email else (),
+                    'smtp_server': email.get('SMTP_SERVER', 'smtp.gmail.com'),
+                    'smtp_port': int(email.get('SMTP_PORT', '587'))
+                }
+            except Exception as e:
+                print(f"❌ Error loading email credentials: {e}")
+                email_settings = {}
+
+        return cls(
+            schwab_app_key=os.getenv('SCHWAB_APP_KEY'),
+            schwab_app_secret=os.getenv('SCHWAB_APP_SECRET'),
+            email_config_found=email_config_found,
+            **email_settings
+        )
+
+
+_config: Optional[Config] = None
@@ -12,28 +12,41 @@ import argparse
 import threading
 import signal
 from datetime import datetime, time as dt_time, timedelta
-import pytz
+from zoneinfo import ZoneInfo
 from typing import List, Dict
 import logging
+import orjson
 
 # Import all our modular components
-from scheduled_coordinator import ScheduledCoordinator
-from schwab_auth import SchwabAuth
+from scheduled_coordinator import ScheduledCoordinator, FREQUENCIES
+from file_utils import write_file_atomic
+
+# Latest health check as JSON, for monitoring scripts
+HEALTH_STATUS_FILE = 'logs/health_status.json'
 
 class ContinuousTrader:
     def __init__(self, symbols: List[str]):
         self.symbols = symbols
-        self.frequencies = ['5m', '10m', '15m', '30m']
+        self.frequencies = list(FREQUENCIES)
         self.coordinator = ScheduledCoordinator()
-        self.schwab_auth = SchwabAuth()
+        self.coordinator.load_components()  # Frequency workers share one set of components
+        # Share the coordinator's auth (and its HTTP session) instead of a second instance
+        self.schwab_auth = self.coordinator.schwab_auth
         
         # Market hours and timezone
-        self.et_timezone = pytz.timezone('US/Eastern')
+        self.et_timezone = ZoneInfo('America/New_York')
         self.market_open = dt_time(9, 30)  # 9:30 AM ET
         self.market_close = dt_time(16, 0)  # 4:00 PM ET
         
         # Timing configuration
         self.health_check_interval = 240  # 4 minutes in seconds
+        self.run_offset_seconds = 5  # 5-second offset to give API time to reflect latest data
+        
+        # Today's market open (plus offset), close and weekday flag, valid until the next ET midnight
+        self._open_epoch = 0.0
+        self._close_epoch = 0.0
+        self._is_weekday = False
+        self._open_epoch_valid_until = 0.0
         
         # Frequency intervals in seconds (aligned to start at 9:30AM)
         self.frequency_intervals = {
@@ -45,6 +58,7 @@ class ContinuousTrader:
         
         # Thread management
         self.running = True
+        self._stop_event = threading.Event()  # Wakes sleeping workers on shutdown
         self.threads = {}
         
         # Logging setup
@@ -71,6 +85,16 @@ class ContinuousTrader:
         """Handle shutdown signals gracefully"""
         self.logger.info(f"Received signal {signum}. Initiating graceful shutdown...")
         self.running = False
+        self._stop_event.set()
+    
+    def _sleep_interruptible(self, seconds: float) -> bool:
+        """
+        Sleep for the given number of seconds, waking early on shutdown
+        
+        Returns:
+            True if shutdown was requested while sleeping
+        """
+        return self._stop_event.wait(max(0.0, seconds))
     
     def is_market_hours(self) -> bool:
         """Check if current time is within market hours"""
@@ -90,23 +114,21 @@ class ContinuousTrader:
             if not self.is_market_day():
                 # If it's weekend, wait until next weekday
                 self.logger.info("Weekend detected. Waiting until next trading day...")
-                time.sleep(3600)  # Check every hour
+                self._sleep_interruptible(self._seconds_until_next_open(time.time()))
                 continue
             
             if not self.is_market_hours():
-                market_open_today = self.et_timezone.localize(
-                    datetime.combine(current_time.date(), self.market_open)
-                )
+                market_open_today = datetime.combine(current_time.date(), self.market_open, tzinfo=self.et_timezone)
                 
                 if current_time < market_open_today:
                     wait_seconds = (market_open_today - current_time).total_seconds()
                     self.logger.info(f"Market opens in {wait_seconds/3600:.2f} hours. Waiting...")
-                    time.sleep(min(wait_seconds, 300))  # Check every 5 minutes or until market open
+                    self._sleep_interruptible(wait_seconds)  # Sleep until market open
                     continue
                 else:
                     # Market is closed for the day
                     self.logger.info("Market is closed for today. Waiting until next trading day...")
-                    time.sleep(3600)  # Check every hour
+                    self._sleep_interruptible(self._seconds_until_next_open(time.time()))
                     continue
             
             # Market is open
@@ -120,21 +142,19 @@ class ContinuousTrader:
         bootstrap_success = True
         
         for symbol in self.symbols:
-            self.logger.info(f"\n📊 Bootstrapping {symbol}...")
+            self.logger.info(f"\n📊 Bootstrapping {symbol} ({', '.join(self.frequencies)})...")
             
-            for frequency in self.frequencies:
-                self.logger.info(f"  🔄 Bootstrap {symbol}_{frequency}...")
-                
-                try:
-                    success = self.coordinator.run_bootstrap(symbol, frequency)
-                    if not success:
-                        self.logger.error(f"❌ Bootstrap failed for {symbol}_{frequency}")
-                        bootstrap_success = False
-                    else:
-                        self.logger.info(f"✅ Bootstrap completed for {symbol}_{frequency}")
-                except Exception as e:
-                    self.logger.error(f"❌ Bootstrap error for {symbol}_{frequency}: {e}")
+            try:
+                # All frequencies fetched concurrently, historical analysis run once
+                success = self.coordinator.run_bootstrap_all(symbol, self.frequencies)
+                if not success:
+                    self.logger.error(f"❌ Bootstrap failed for {symbol}")
                     bootstrap_success = False
+                else:
+                    self.logger.info(f"✅ Bootstrap completed for {symbol}")
+            except Exception as e:
+                self.logger.error(f"❌ Bootstrap error for {symbol}: {e}")
+                bootstrap_success = False
         
         if bootstrap_success:
             self.logger.info("✅ BOOTSTRAP PROCESS COMPLETED SUCCESSFULLY")
@@ -143,29 +163,48 @@ class ContinuousTrader:
         
         return bootstrap_success
     
-    def calculate_next_run_time(self, frequency: str) -> datetime:
-        """Calculate the next run time for a frequency based on market opening with 5-second offset"""
-        current_time = datetime.now(self.et_timezone)
-        interval_seconds = self.frequency_intervals[frequency]
-        offset_seconds = 5  # 5-second offset to give API time to reflect latest data
-        
-        # Calculate market open time for today with offset
-        market_open_today = self.et_timezone.localize(
-            datetime.combine(current_time.date(), self.market_open)
-        ) + timedelta(seconds=offset_seconds)
+    def _market_open_epoch(self, now: float) -> float:
+        """Get today's market open plus run offset as epoch seconds, rebuilt once per ET day"""
+        if now >= self._open_epoch_valid_until:
+            today = datetime.fromtimestamp(now, self.et_timezone).date()
+            market_open_today = datetime.combine(today, self.market_open, tzinfo=self.et_timezone)
+            market_close_today = datetime.combine(today, self.market_close, tzinfo=self.et_timezone)
+            next_midnight = datetime.combine(today + timedelta(days=1), dt_time(0, 0), tzinfo=self.et_timezone)
+            self._open_epoch = market_open_today.timestamp() + self.run_offset_seconds
+            self._close_epoch = market_close_today.timestamp()
+            self._is_weekday = today.weekday() < 5
+            self._open_epoch_valid_until = next_midnight.timestamp()
+        return self._open_epoch
+    
+    def _seconds_until_next_open(self, now: float) -> float:
+        """Get the seconds from an epoch time until the next weekday's market open"""
+        next_day = datetime.fromtimestamp(now, self.et_timezone).date() + timedelta(days=1)
+        while next_day.weekday() >= 5:
+            next_day += timedelta(days=1)
+        return datetime.combine(next_day, self.market_open, tzinfo=self.et_timezone).timestamp() - now
+    
+    def _is_market_hours_at(self, now: float) -> bool:
+        """is_market_hours for an epoch-seconds time, without building a datetime"""
+        open_epoch = self._market_open_epoch(now) - self.run_offset_seconds
+        return open_epoch <= now <= self._close_epoch
+    
+    def calculate_next_run_epoch(self, frequency: str) -> float:
+        """Calculate the next run time for a frequency as epoch seconds (float arithmetic only)"""
+        now = time.time()
+        open_epoch = self._market_open_epoch(now)
         
         # If we're before market open, start from market open + offset
-        if current_time < market_open_today:
-            return market_open_today
-        
-        # Calculate elapsed time since market open (with offset)
-        elapsed_seconds = (current_time - market_open_today).total_seconds()
+        if now < open_epoch:
+            return open_epoch
         
-        # Calculate next interval boundary with offset
-        intervals_passed = int(elapsed_seconds // interval_seconds)
-        next_interval_start = market_open_today + timedelta(seconds=(intervals_passed + 1) * interval_seconds)
-        
-        return next_interval_start
+        # Next interval boundary counted from market open + offset
+        interval_seconds = self.frequency_intervals[frequency]
+        intervals_passed = (now - open_epoch) // interval_seconds
+        return open_epoch + (intervals_passed + 1) * interval_seconds
+    
+    def calculate_next_run_time(self, frequency: str) -> datetime:
+        """Calculate the next run time for a frequency based on market opening with 5-second offset"""
+        return datetime.fromtimestamp(self.calculate_next_run_epoch(frequency), self.et_timezone)
     
     def frequency_worker(self, frequency: str):
         """Worker thread for a specific frequency"""
@@ -173,24 +212,28 @@ class ContinuousTrader:
         
         while self.running:
             # Check if we're in market hours and it's a market day
-            if not self.is_market_day() or not self.is_market_hours():
-                self.logger.info(f"📅 {frequency} worker: Outside market hours, sleeping...")
-                time.sleep(60)  # Check every minute
+            # Before the open the boundary wait below sleeps straight through to it
+            now = time.time()
+            self._market_open_epoch(now)  # Refreshes today's cached close and weekday flag
+            if not self._is_weekday or now > self._close_epoch:
+                self.logger.info(f"📅 {frequency} worker: Outside market hours, sleeping until the next open...")
+                self._sleep_interruptible(self._seconds_until_next_open(now))
                 continue
             
-            # Calculate next run time
-            next_run = self.calculate_next_run_time(frequency)
-            current_time = datetime.now(self.et_timezone)
+            # Sleep exactly until the next interval boundary instead of polling
+            next_run = self.calculate_next_run_epoch(frequency)
+            wait_seconds = next_run - time.time()
+            next_run_et = datetime.fromtimestamp(next_run, self.et_timezone)  # Wall clock for display only
+            self.logger.info(f"⏰ {frequency} worker: Next run at {next_run_et.strftime('%H:%M:%S')}, waiting {wait_seconds:.0f}s")
+            if self._sleep_interruptible(wait_seconds):
+                break
             
-            # Wait until next run time
-            if current_time < next_run:
-                wait_seconds = (next_run - current_time).total_seconds()
-                if wait_seconds > 0:
-                    self.logger.info(f"⏰ {frequency} worker: Next run at {next_run.strftime('%H:%M:%S')}, waiting {wait_seconds:.0f}s")
-                    time.sleep(min(wait_seconds, 60))  # Check every minute or until run time
-                    continue
+            if not self._is_market_hours_at(time.time()):
+                continue
             
-            # Execute trading logic for all symbols at this frequency
+            # Execute trading logic for all symbols at this frequency, one at a time:
+            # the position tracker's state is keyed by period only, so symbols sharing
+            # a frequency must not race for it
             self.logger.info(f"🎯 EXECUTING {frequency.upper()} TRADING CYCLE")
             self.logger.info("-" * 50)
             
@@ -211,54 +254,74 @@ class ContinuousTrader:
                     self.logger.error(f"❌ Error processing {symbol}_{frequency}: {e}")
             
             self.logger.info(f"🏁 {frequency.upper()} cycle completed")
-            time.sleep(5)  # Small delay before next cycle
     
     def health_check_worker(self):
         """Health check worker that runs every 4 minutes"""
         self.logger.info("🏥 Starting health check worker")
         
         while self.running:
-            time.sleep(self.health_check_interval)
-            
-            if not self.running:
+            if self._sleep_interruptible(self.health_check_interval):
                 break
             
             current_time = datetime.now(self.et_timezone)
-            self.logger.info(f"\n🏥 HEALTH CHECK: {current_time.strftime('%Y-%m-%d %H:%M:%S')} ET")
-            self.logger.info("=" * 60)
             
             # Check market status
             market_day = self.is_market_day()
             market_hours = self.is_market_hours()
             
-            self.logger.info(f"📅 Market Day: {'✅ Yes' if market_day else '❌ No (Weekend)'}")
-            self.logger.info(f"🕒 Market Hours: {'✅ Yes' if market_hours else '❌ No'}")
-            
             # Check authentication
             auth_valid = self.schwab_auth.is_authenticated()
-            self.logger.info(f"🔐 Authentication: {'✅ Valid' if auth_valid else '❌ Invalid'}")
-            
-            if not auth_valid:
-                self.logger.warning("⚠️  Authentication expired - attempting refresh...")
-                self.schwab_auth.refresh_access_token()
             
             # Check thread status
             active_threads = sum(1 for thread in self.threads.values() if thread.is_alive())
             expected_threads = len(self.frequencies)
             
-            self.logger.info(f"🧵 Worker Threads: {active_threads}/{expected_threads} active")
-            
-            if market_day and market_hours and active_threads < expected_threads:
-                self.logger.warning("⚠️  Some worker threads are down - system may need restart")
+            # The report is built up and logged as one record instead of a write per line
+            report = [
+                f"\n🏥 HEALTH CHECK: {current_time.strftime('%Y-%m-%d %H:%M:%S')} ET",
+                "=" * 60,
+                f"📅 Market Day: {'✅ Yes' if market_day else '❌ No (Weekend)'}",
+                f"🕒 Market Hours: {'✅ Yes' if market_hours else '❌ No'}",
+                f"🔐 Authentication: {'✅ Valid' if auth_valid else '❌ Invalid'}",
+                f"🧵 Worker Threads: {active_threads}/{expected_threads} active"
+            ]
             
             # Display position summary
+            positions = None
+            position_error = None
             try:
                 positions = self.coordinator.position_tracker.get_position_status()
-                self.logger.info("📊 Current Positions:")
-                for period, status in positions.items():
-                    self.logger.info(f"   {period}: {status}")
+                report.append("📊 Current Positions:")
+                report.extend(f"   {period}: {status}" for period, status in positions.items())
             except Exception as e:
-                self.logger.error(f"❌ Error getting position status: {e}")
+                position_error = e
+            
+            self.logger.info("\n".join(report))
+            
+            # Same report in machine-readable form, replaced atomically so readers never see a partial file
+            status = {
+                'checked_at': current_time.isoformat(),
+                'market_day': market_day,
+                'market_hours': market_hours,
+                'auth_valid': auth_valid,
+                'active_threads': active_threads,
+                'expected_threads': expected_threads,
+                'positions': positions
+            }
+            try:
+                write_file_atomic(HEALTH_STATUS_FILE, orjson.dumps(status).decode())
+            except OSError as e:
+                self.logger.warning(f"⚠️  Could not write {HEALTH_STATUS_FILE}: {e}")
+            
+            if not auth_valid:
+                self.logger.warning("⚠️  Authentication expired - attempting refresh...")
+                self.schwab_auth.refresh_access_token()
+            
+            if market_day and market_hours and active_threads < expected_threads:
+                self.logger.warning("⚠️  Some worker threads are down - system may need restart")
+            
+            if position_error is not None:
+                self.logger.error(f"❌ Error getting position status: {position_error}")
             
             self.logger.info("🏥 Health check completed")
     
@@ -314,13 +377,14 @@ class ContinuousTrader:
         # Main loop - keep the program alive
         try:
             while self.running:
-                time.sleep(1)
+                self._stop_event.wait(1)
         except KeyboardInterrupt:
             self.logger.info("Keyboard interrupt received")
         
         # Shutdown
         self.logger.info("\n🛑 SHUTTING DOWN CONTINUOUS TRADING SYSTEM")
         self.running = False
+        self._stop_event.set()
         
         # Wait for threads to finish
         for name, thread in self.threads.items():
@@ -328,6 +392,9 @@ class ContinuousTrader:
                 self.logger.info(f"Waiting for {name} thread to finish...")
                 thread.join(timeout=10)
         
+        # Release pooled API connections
+        self.coordinator.close()
+        
         self.logger.info("✅ Continuous trading system shutdown complete")
 
 
@@ -340,8 +407,9 @@ def main():
     
     args = parser.parse_args()
     
-    # Parse symbols
-    symbols = [symbol.strip().upper() for symbol in args.symbols.split(',')]
+    # Parse symbols once, dropping blanks and duplicates (order preserved) so no
+    # symbol is fetched twice per cycle
+    symbols = list(dict.fromkeys(symbol.strip().upper() for symbol in args.symbols.split(',') if symbol.strip()))
     
     if not symbols:
         print("❌ No symbols provided")
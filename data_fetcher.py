@@ -4,26 +4,110 @@ Data Fetcher Module
 Handles all data retrieval, CSV operations, and timestamp management
 """
 
+import io
 import os
-import csv
+import mmap
+import logging
+import time as time_module
+from bisect import bisect_left, bisect_right
+import orjson
 import requests
 import pandas as pd
+from dataclasses import dataclass
+from functools import lru_cache
+from itertools import pairwise
 from datetime import datetime, timezone, time, timedelta
-import pytz
+from zoneinfo import ZoneInfo
 from typing import Optional, Dict, List, Tuple
-from schwab_auth import SchwabAuth
+from schwab_auth import SchwabAuth, create_http_session
+from config import Config
+from file_utils import write_file_atomic
+
+logger = logging.getLogger(__name__)
+
+# Supported frequencies and their pricehistory API parameters
+FREQUENCY_PARAMS = {
+    '1m': {'frequencyType': 'minute', 'frequency': 1},
+    '5m': {'frequencyType': 'minute', 'frequency': 5},
+    '10m': {'frequencyType': 'minute', 'frequency': 10},
+    '15m': {'frequencyType': 'minute', 'frequency': 15},
+    '30m': {'frequencyType': 'minute', 'frequency': 30}
+}
+
+# Candle duration per frequency in milliseconds, including the 1-minute default
+FREQUENCY_MS = {'1m': 60 * 1000, **{f: p['frequency'] * 60 * 1000 for f, p in FREQUENCY_PARAMS.items()}}
+
+# Price and indicator columns, parsed straight to float64 instead of type-inferred
+CSV_FLOAT_DTYPES = dict.fromkeys(['open', 'high', 'low', 'close', 'ema_7', 'vwma_17', 'ema_12', 'ema_26',
+                                  'macd_line', 'macd_signal', 'roc_8'], 'float64')
+
+# Indicator columns written empty on append (filled in by indicator_calculator)
+INDICATOR_PLACEHOLDERS = ',' * 7
+
+
+@lru_cache(maxsize=4096)
+def format_csv_datetime(timestamp_ms: int) -> str:
+    """
+    Format an epoch-millisecond timestamp as local 'YYYY-mm-dd HH:MM:SS', for the
+    CSV datetime column and log messages
+    
+    Cached because the regular and inverse files are written with the same timestamps.
+    
+    Args:
+        timestamp_ms: UNIX epoch milliseconds
+        
+    Returns:
+        'YYYY-mm-dd HH:MM:SS' string
+    """
+    return '%04d-%02d-%02d %02d:%02d:%02d' % time_module.localtime(timestamp_ms // 1000)[:6]
+
+
+def _candle_datetime(candle: Dict) -> int:
+    """Sort key for raw API candles; missing timestamps sort first"""
+    return candle.get('datetime') or 0
+
+
+@dataclass(slots=True)
+class Candle:
+    """One OHLCV candle; timestamp is UNIX epoch milliseconds"""
+    timestamp: Optional[int]
+    open: Optional[float]
+    high: Optional[float]
+    low: Optional[float]
+    close: Optional[float]
+    volume: Optional[int]
+
+    @classmethod
+    def from_api(cls, candle: Dict) -> 'Candle':
+        """Build a Candle from a pricehistory API candle dictionary"""
+        return cls(candle.get('datetime'), candle.get('open'), candle.get('high'),
+                   candle.get('low'), candle.get('close'), candle.get('volume'))
+
 
 class DataFetcher:
-    def __init__(self):
-        self.data_dir = "data"
-        self.et_timezone = pytz.timezone('US/Eastern')
+    def __init__(self, config: Optional[Config] = None, session: Optional[requests.Session] = None):
+        self.config = config or Config.load()
+        # Keep-alive session shared with auth so API calls reuse connections
+        self.session = session or create_http_session()
+        self.data_dir = self.config.data_dir
+        self.et_timezone = ZoneInfo('America/New_York')
         self.market_open = time(9, 30)  # 9:30 AM ET
         self.market_close = time(16, 0)  # 4:00 PM ET
-        self.schwab_auth = SchwabAuth()
+        self.schwab_auth = SchwabAuth(self.config, session=self.session)
+        
+        # CSV paths per (symbol, period, inverse), built once
+        self._csv_paths: Dict[Tuple[str, str, bool], str] = {}
+        
+        # Latest saved timestamp per CSV path, kept current by append_to_csv
+        self._last_timestamps: Dict[str, int] = {}
         
         # Ensure data directory exists
         os.makedirs(self.data_dir, exist_ok=True)
     
+    def close(self):
+        """Close the HTTP session (shared with auth) and its pooled connections"""
+        self.session.close()
+    
     def get_csv_path(self, symbol: str, period: str, inverse: bool = False) -> str:
         """
         Get the CSV file path for a symbol and period
@@ -36,11 +120,15 @@ class DataFetcher:
         Returns:
             Full path to CSV file
         """
-        if inverse:
-            filename = f"{symbol}_{period}_INVERSE.csv"
-        else:
-            filename = f"{symbol}_{period}.csv"
-        return os.path.join(self.data_dir, filename)
+        key = (symbol, period, inverse)
+        csv_path = self._csv_paths.get(key)
+        if csv_path is None:
+            if inverse:
+                filename = f"{symbol}_{period}_INVERSE.csv"
+            else:
+                filename = f"{symbol}_{period}.csv"
+            csv_path = self._csv_paths[key] = os.path.join(self.data_dir, filename)
+        return csv_path
     
     def get_latest_timestamp_from_csv(self, symbol: str, period: str, inverse: bool = False) -> Optional[int]:
         """
@@ -55,40 +143,63 @@ class DataFetcher:
             Latest timestamp in milliseconds, or None if file is empty/doesn't exist
         """
         csv_path = self.get_csv_path(symbol, period, inverse)
-        
-        if not os.path.exists(csv_path):
-            file_type = "INVERSE" if inverse else "regular"
-            print(f"📁 {file_type} CSV file {csv_path} does not exist")
-            return None
+        file_type = "INVERSE" if inverse else "regular"
         
         try:
-            df = pd.read_csv(csv_path)
-            
-            if df.empty or 'timestamp' not in df.columns:
-                file_type = "INVERSE" if inverse else "regular"
-                print(f"📊 {file_type} CSV file {csv_path} is empty or missing timestamp column")
-                return None
+            # Candles are appended in time order, so the last data row holds the latest timestamp;
+            # the file is only read on the first lookup, appends keep the cache current after that
+            latest_timestamp = self._last_timestamps.get(csv_path)
+            if latest_timestamp is None:
+                latest_timestamp = self._read_last_timestamp(csv_path)
+                if latest_timestamp is not None:
+                    self._last_timestamps[csv_path] = latest_timestamp
             
-            # Remove any empty rows
-            df = df.dropna(subset=['timestamp'])
-            
-            if df.empty:
-                file_type = "INVERSE" if inverse else "regular"
+            if latest_timestamp is None:
                 print(f"📊 No valid timestamps found in {file_type} {csv_path}")
                 return None
             
-            latest_timestamp = int(df['timestamp'].max())
-            latest_datetime = datetime.fromtimestamp(latest_timestamp / 1000)
-            
-            file_type = "INVERSE" if inverse else "regular"
-            print(f"📅 Latest timestamp in {file_type} {csv_path}: {latest_timestamp} ({latest_datetime})")
+            logger.debug("📅 Latest timestamp in %s %s: %s (%s)",
+                         file_type, csv_path, latest_timestamp, format_csv_datetime(latest_timestamp))
             return latest_timestamp
             
+        except FileNotFoundError:
+            print(f"📁 {file_type} CSV file {csv_path} does not exist")
+            return None
         except Exception as e:
-            file_type = "INVERSE" if inverse else "regular"
             print(f"❌ Error reading {file_type} CSV file {csv_path}: {e}")
             return None
 
+    def _read_last_timestamp(self, csv_path: str, block_size: int = 4096) -> Optional[int]:
+        """
+        Read the timestamp of the last data row by scanning back from the end of the file
+        
+        Args:
+            csv_path: Path to a candle CSV file (timestamp is the first column)
+            block_size: Initial number of bytes to read from the end
+            
+        Returns:
+            Last timestamp in milliseconds, or None if the file has no data rows
+        """
+        with open(csv_path, 'rb') as f:
+            size = f.seek(0, os.SEEK_END)
+            tail_size = 0
+            while tail_size < size:
+                tail_size = min(size, max(block_size, tail_size * 2))
+                f.seek(size - tail_size)
+                lines = f.read(tail_size).splitlines()
+                if tail_size < size:
+                    lines = lines[1:]  # First line of the tail may be partial
+                
+                for line in reversed(lines):
+                    field = line.split(b',', 1)[0].strip()
+                    if not field:
+                        continue  # Blank line or row without a timestamp
+                    try:
+                        return int(float(field))
+                    except ValueError:
+                        return None  # Reached the header row
+        return None
+
     def convert_et_to_epoch_ms(self, target_date: datetime.date = None) -> Tuple[int, int]:
         """
         Convert 9:30 AM ET and 4:00 PM ET to UNIX epoch milliseconds
@@ -103,20 +214,15 @@ class DataFetcher:
             target_date = datetime.now(self.et_timezone).date()
         
         # Create datetime objects for market open and close in ET
-        market_open_et = self.et_timezone.localize(
-            datetime.combine(target_date, self.market_open)
-        )
-        market_close_et = self.et_timezone.localize(
-            datetime.combine(target_date, self.market_close)
-        )
+        market_open_et = datetime.combine(target_date, self.market_open, tzinfo=self.et_timezone)
+        market_close_et = datetime.combine(target_date, self.market_close, tzinfo=self.et_timezone)
         
         # Convert to UTC and then to epoch milliseconds
         start_time_ms = int(market_open_et.astimezone(timezone.utc).timestamp() * 1000)
         end_time_ms = int(market_close_et.astimezone(timezone.utc).timestamp() * 1000)
         
-        print(f"🕘 Market hours for {target_date}:")
-        print(f"   Start: {market_open_et} ({start_time_ms})")
-        print(f"   End: {market_close_et} ({end_time_ms})")
+        logger.debug("🕘 Market hours for %s: %s (%s) to %s (%s)",
+                     target_date, market_open_et, start_time_ms, market_close_et, end_time_ms)
         
         return start_time_ms, end_time_ms
 
@@ -132,13 +238,6 @@ class DataFetcher:
         Returns:
             List of price data dictionaries, or None if failed
         """
-        headers = self.schwab_auth.get_auth_headers()
-        if not headers:
-            print("❌ No valid authentication available")
-            return None
-        
-        url = "https://api.schwabapi.com/marketdata/v1/pricehistory"
-        
         params = {
             'symbol': symbol,
             'periodType': 'day',
@@ -152,14 +251,14 @@ class DataFetcher:
         }
         
         print(f"📡 Fetching price history for {symbol} from Schwab API...")
-        print(f"   URL: {url}")
-        print(f"   Params: {params}")
         
         try:
-            response = requests.get(url, headers=headers, params=params)
+            response = self._request_price_history(params)
+            if response is None:
+                return None
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 
                 if 'candles' in data and data['candles']:
                     print(f"✅ Retrieved {len(data['candles'])} candles from Schwab API")
@@ -176,57 +275,74 @@ class DataFetcher:
             print(f"❌ Error fetching price history: {e}")
             return None
 
-    def calculate_inverse_candles(self, candles: List[Dict]) -> List[Dict]:
+    def _request_price_history(self, params: Dict) -> Optional[requests.Response]:
+        """
+        GET the pricehistory endpoint, refreshing the token and retrying once on 401
+        
+        Args:
+            params: Query parameters
+            
+        Returns:
+            The API response, or None if no valid authentication is available
+        """
+        headers = self.schwab_auth.get_auth_headers()
+        if not headers:
+            print("❌ No valid authentication available")
+            return None
+        
+        url = f"{self.config.api_base_url}/marketdata/v1/pricehistory"
+        logger.debug("   URL: %s", url)
+        logger.debug("   Params: %s", params)
+        
+        response = self.session.get(url, headers=headers, params=params)
+        if response.status_code == 401 and self.schwab_auth.force_refresh():
+            print("🔄 Access token rejected (401), retrying with a refreshed token...")
+            response = self.session.get(url, headers=self.schwab_auth.get_auth_headers(), params=params)
+        return response
+
+    def calculate_inverse_candles(self, candles: List[Candle]) -> List[Candle]:
         """
         Calculate inverse price candles (1/price) from regular candles
         
         Args:
-            candles: List of regular candle data from API
+            candles: List of regular candles
             
         Returns:
-            List of inverse candle data
+            List of inverse candles
         """
         inverse_candles = []
         
         for candle in candles:
             try:
                 # Extract OHLC values
-                open_price = float(candle.get('open', 0))
-                high_price = float(candle.get('high', 0))
-                low_price = float(candle.get('low', 0))
-                close_price = float(candle.get('close', 0))
+                open_price = float(candle.open or 0)
+                high_price = float(candle.high or 0)
+                low_price = float(candle.low or 0)
+                close_price = float(candle.close or 0)
                 
                 # Skip candles with zero or invalid prices
-                if any(price <= 0 for price in [open_price, high_price, low_price, close_price]):
+                if open_price <= 0 or high_price <= 0 or low_price <= 0 or close_price <= 0:
                     continue
                 
                 # Calculate inverse prices (1/price)
                 # For inverse: high becomes low, low becomes high
-                inverse_open = 1.0 / open_price
-                inverse_high = 1.0 / low_price   # Inverse of low becomes high
-                inverse_low = 1.0 / high_price   # Inverse of high becomes low
-                inverse_close = 1.0 / close_price
-                
-                # Create inverse candle
-                inverse_candle = {
-                    'datetime': candle.get('datetime'),
-                    'open': inverse_open,
-                    'high': inverse_high,
-                    'low': inverse_low,
-                    'close': inverse_close,
-                    'volume': candle.get('volume', 0)  # Volume stays the same
-                }
-                
-                inverse_candles.append(inverse_candle)
+                inverse_candles.append(Candle(
+                    candle.timestamp,
+                    1.0 / open_price,
+                    1.0 / low_price,    # Inverse of low becomes high
+                    1.0 / high_price,   # Inverse of high becomes low
+                    1.0 / close_price,
+                    candle.volume or 0  # Volume stays the same
+                ))
                 
             except (ValueError, TypeError, ZeroDivisionError) as e:
                 print(f"⚠️  Error calculating inverse for candle: {e}")
                 continue
         
-        print(f"🔄 Calculated {len(inverse_candles)} inverse candles from {len(candles)} regular candles")
+        logger.debug("🔄 Calculated %d inverse candles from %d regular candles", len(inverse_candles), len(candles))
         return inverse_candles
 
-    def filter_new_data(self, candles: List[Dict], last_timestamp_ms: Optional[int]) -> List[Dict]:
+    def filter_new_data(self, candles: List[Dict], last_timestamp_ms: Optional[int]) -> List[Candle]:
         """
         Filter candles to only include data after the last recorded timestamp
         and exclude the current minute that's still forming
@@ -236,52 +352,11 @@ class DataFetcher:
             last_timestamp_ms: Last timestamp in CSV (in milliseconds)
             
         Returns:
-            Filtered list of new candles (excluding current forming minute)
+            Filtered list of new Candles (excluding current forming minute)
         """
-        if not candles:
-            return []
-        
-        # Get current time and calculate the current minute boundary
-        current_time = datetime.now(self.et_timezone)
-        current_minute_boundary = current_time.replace(second=0, microsecond=0)
-        current_minute_ms = int(current_minute_boundary.timestamp() * 1000)
-        
-        print(f"🕐 Current time: {current_time.strftime('%H:%M:%S')} ET")
-        print(f"🕐 Current minute boundary: {current_minute_boundary.strftime('%H:%M:%S')} ({current_minute_ms})")
-        
-        # Filter out the current forming minute
-        completed_candles = []
-        for candle in candles:
-            candle_timestamp = candle.get('datetime')
-            if candle_timestamp and candle_timestamp < current_minute_ms:
-                completed_candles.append(candle)
-        
-        print(f"🔍 Filtered out current forming minute: {len(candles)} → {len(completed_candles)} completed candles")
-        
-        # Now filter based on last recorded timestamp
-        if last_timestamp_ms is None:
-            print("📊 No previous timestamp found, returning all completed candles")
-            new_candles = completed_candles
-        else:
-            new_candles = []
-            for candle in completed_candles:
-                candle_timestamp = candle.get('datetime')
-                if candle_timestamp and candle_timestamp > last_timestamp_ms:
-                    new_candles.append(candle)
-        
-        print(f"🔍 Filtered {len(new_candles)} new completed candles from {len(completed_candles)} total completed candles")
-        print(f"   Last recorded: {datetime.fromtimestamp(last_timestamp_ms / 1000) if last_timestamp_ms else 'None'}")
-        
-        if new_candles:
-            first_new = datetime.fromtimestamp(new_candles[0]['datetime'] / 1000)
-            last_new = datetime.fromtimestamp(new_candles[-1]['datetime'] / 1000)
-            print(f"   New data range: {first_new} to {last_new}")
-        else:
-            print("   No new completed candles to save")
-        
-        return new_candles
+        return self.filter_new_data_for_frequency(candles, last_timestamp_ms, '1m')
 
-    def append_to_csv(self, symbol: str, period: str, new_candles: List[Dict], inverse: bool = False) -> bool:
+    def append_to_csv(self, symbol: str, period: str, new_candles: List[Candle], inverse: bool = False) -> bool:
         """
         Append new candle data to CSV file (without indicators - those are calculated separately)
         
@@ -301,41 +376,35 @@ class DataFetcher:
         
         csv_path = self.get_csv_path(symbol, period, inverse)
         
-        # Check if file exists and has headers
-        file_exists = os.path.exists(csv_path)
         headers = ['timestamp', 'datetime', 'open', 'high', 'low', 'close', 'volume', 
                   'ema_7', 'vwma_17', 'ema_12', 'ema_26', 'macd_line', 'macd_signal', 'roc_8']
         
         try:
-            with open(csv_path, 'a', newline='') as csvfile:
-                writer = csv.writer(csvfile)
+            # Format rows directly: numbers and datetimes never need CSV quoting
+            lines = []
+            for candle in new_candles:
+                fields = (candle.timestamp, candle.open, candle.high, candle.low, candle.close, candle.volume)
+                if None in fields:
+                    # Missing values are written as empty fields
+                    fields = tuple('' if value is None else value for value in fields)
+                timestamp, open_price, high_price, low_price, close_price, volume = fields
                 
-                # Write headers if file is new or empty
-                if not file_exists or os.path.getsize(csv_path) == 0:
-                    writer.writerow(headers)
+                datetime_str = format_csv_datetime(timestamp) if timestamp else ''
+                lines.append(f"{timestamp},{datetime_str},{open_price},{high_price},{low_price},"
+                             f"{close_price},{volume}{INDICATOR_PLACEHOLDERS}\n")
+            
+            # Large buffer so a batch of rows reaches disk in one sequential write
+            with open(csv_path, 'a', newline='', buffering=65536) as csvfile:
+                # Write headers if file is new or empty (append mode opens at the end)
+                if csvfile.tell() == 0:
+                    csvfile.write(','.join(headers) + '\n')
                 
                 # Append new candles
-                for candle in new_candles:
-                    timestamp = candle.get('datetime')
-                    dt = datetime.fromtimestamp(timestamp / 1000) if timestamp else None
-                    
-                    row = [
-                        timestamp,
-                        dt.strftime('%Y-%m-%d %H:%M:%S') if dt else '',
-                        candle.get('open', ''),
-                        candle.get('high', ''),
-                        candle.get('low', ''),
-                        candle.get('close', ''),
-                        candle.get('volume', ''),
-                        '',  # ema_7 placeholder - calculated by indicator_calculator
-                        '',  # vwma_17 placeholder - calculated by indicator_calculator
-                        '',  # ema_12 placeholder - calculated by indicator_calculator  
-                        '',  # ema_26 placeholder - calculated by indicator_calculator
-                        '',  # macd_line placeholder - calculated by indicator_calculator
-                        '',  # macd_signal placeholder - calculated by indicator_calculator
-                        ''   # roc_8 placeholder - calculated by indicator_calculator
-                    ]
-                    writer.writerow(row)
+                csvfile.write(''.join(lines))
+            
+            last_timestamp = new_candles[-1].timestamp
+            if last_timestamp:
+                self._last_timestamps[csv_path] = last_timestamp
             
             file_type = "INVERSE" if inverse else "regular"
             print(f"✅ Successfully appended {len(new_candles)} candles to {file_type} {csv_path}")
@@ -346,7 +415,8 @@ class DataFetcher:
             print(f"❌ Error writing to {file_type} CSV file {csv_path}: {e}")
             return False
 
-    def load_csv_data(self, symbol: str, period: str, inverse: bool = False) -> Optional[pd.DataFrame]:
+    def load_csv_data(self, symbol: str, period: str, inverse: bool = False,
+                      columns: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
         """
         Load CSV data into a DataFrame
         
@@ -354,22 +424,63 @@ class DataFetcher:
             symbol: Stock symbol
             period: Time period
             inverse: Whether to load inverse price file
+            columns: Only parse these columns (defaults to all)
             
         Returns:
             DataFrame with CSV data, or None if error
         """
         csv_path = self.get_csv_path(symbol, period, inverse)
         
-        if not os.path.exists(csv_path):
+        try:
+            df = pd.read_csv(csv_path, usecols=columns, dtype=CSV_FLOAT_DTYPES)
+            file_type = "INVERSE" if inverse else "regular"
+            logger.debug("📊 Loaded %d rows from %s %s", len(df), file_type, csv_path)
+            return df
+        except FileNotFoundError:
             file_type = "INVERSE" if inverse else "regular"
             print(f"❌ {file_type} CSV file not found: {csv_path}")
             return None
+        except Exception as e:
+            file_type = "INVERSE" if inverse else "regular"
+            print(f"❌ Error loading {file_type} CSV file {csv_path}: {e}")
+            return None
+
+    def load_csv_tail(self, symbol: str, period: str, rows: int, inverse: bool = False) -> Optional[pd.DataFrame]:
+        """
+        Load only the header and the last rows of a CSV file into a DataFrame
+        
+        Args:
+            symbol: Stock symbol
+            period: Time period
+            rows: Number of trailing lines to parse
+            inverse: Whether to load inverse price file
+            
+        Returns:
+            DataFrame with up to 'rows' trailing rows, or None if error
+        """
+        csv_path = self.get_csv_path(symbol, period, inverse)
         
         try:
-            df = pd.read_csv(csv_path)
+            with open(csv_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size == 0:
+                    return pd.DataFrame()
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                    header_end = mm.find(b'\n') + 1
+                    if header_end == 0:
+                        return pd.read_csv(io.BytesIO(mm[:]), dtype=CSV_FLOAT_DTYPES)
+                    
+                    # Walk back over 'rows' newlines (ignoring the file's trailing one)
+                    pos = len(mm) - 1 if mm[-1:] == b'\n' else len(mm)
+                    for _ in range(rows):
+                        pos = mm.rfind(b'\n', header_end - 1, pos)
+                        if pos < header_end:
+                            pos = header_end - 1
+                            break
+                    return pd.read_csv(io.BytesIO(mm[:header_end] + mm[pos + 1:]), dtype=CSV_FLOAT_DTYPES)
+        except FileNotFoundError:
             file_type = "INVERSE" if inverse else "regular"
-            print(f"📊 Loaded {len(df)} rows from {file_type} {csv_path}")
-            return df
+            print(f"❌ {file_type} CSV file not found: {csv_path}")
+            return None
         except Exception as e:
             file_type = "INVERSE" if inverse else "regular"
             print(f"❌ Error loading {file_type} CSV file {csv_path}: {e}")
@@ -391,9 +502,10 @@ class DataFetcher:
         csv_path = self.get_csv_path(symbol, period, inverse)
         
         try:
-            df.to_csv(csv_path, index=False)
+            # Swapped in atomically, so an interrupted save never truncates the CSV
+            write_file_atomic(csv_path, df.to_csv(index=False))
             file_type = "INVERSE" if inverse else "regular"
-            print(f"✅ Saved {len(df)} rows to {file_type} {csv_path}")
+            logger.debug("✅ Saved %d rows to %s %s", len(df), file_type, csv_path)
             return True
         except Exception as e:
             file_type = "INVERSE" if inverse else "regular"
@@ -450,26 +562,33 @@ class DataFetcher:
             print("📊 No new data to process")
             return True
         
-        # Step 5: Calculate inverse candles
-        inverse_candles = self.calculate_inverse_candles(new_candles)
-        
-        # Step 6: Append new data to both regular and inverse CSV files
-        success_regular = self.append_to_csv(symbol, period, new_candles, inverse=False)
-        success_inverse = self.append_to_csv(symbol, period, inverse_candles, inverse=True)
-        
-        overall_success = success_regular and success_inverse
+        # Step 5: Calculate inverse candles and append both to their CSV files
+        overall_success = self._save_regular_and_inverse(symbol, period, new_candles)
         
         if overall_success:
             print(f"✅ Data fetch completed for {symbol}_{period} (regular + inverse)")
         else:
             print(f"❌ Data fetch failed for {symbol}_{period}")
-            if not success_regular:
-                print("   - Regular data save failed")
-            if not success_inverse:
-                print("   - Inverse data save failed")
         
         return overall_success
 
+    def _save_regular_and_inverse(self, symbol: str, period: str, new_candles: List[Candle]) -> bool:
+        """
+        Calculate inverse candles and append both sets to their CSV files
+        
+        Args:
+            symbol: Stock symbol
+            period: Time period
+            new_candles: New regular candles
+            
+        Returns:
+            True if both files were saved, False otherwise
+        """
+        inverse_candles = self.calculate_inverse_candles(new_candles)
+        regular_success = self.append_to_csv(symbol, period, new_candles, inverse=False)
+        inverse_success = self.append_to_csv(symbol, period, inverse_candles, inverse=True)
+        return regular_success and inverse_success
+
     def fetch_data_at_frequency(self, symbol: str, frequency: str, target_date: datetime.date = None) -> bool:
         """
         Fetch market data at a specific frequency directly from Schwab API
@@ -482,45 +601,31 @@ class DataFetcher:
         Returns:
             True if successful, False otherwise
         """
-        # Validate frequency
-        valid_frequencies = ['1m', '5m', '10m', '15m', '30m']
-        if frequency not in valid_frequencies:
-            print(f"❌ Invalid frequency: {frequency}. Must be one of {valid_frequencies}")
+        # Validate frequency and convert it to API parameters
+        freq_params = FREQUENCY_PARAMS.get(frequency)
+        if freq_params is None:
+            print(f"❌ Invalid frequency: {frequency}. Must be one of {list(FREQUENCY_PARAMS)}")
             return False
         
-        # Convert frequency to API parameters
-        frequency_map = {
-            '1m': {'frequencyType': 'minute', 'frequency': 1},
-            '5m': {'frequencyType': 'minute', 'frequency': 5},
-            '10m': {'frequencyType': 'minute', 'frequency': 10},
-            '15m': {'frequencyType': 'minute', 'frequency': 15},
-            '30m': {'frequencyType': 'minute', 'frequency': 30}
-        }
-        
-        freq_params = frequency_map[frequency]
-        
         print(f"\n📡 Fetching {frequency} data for {symbol} (regular + inverse)")
         print("=" * 60)
         
         # Get latest timestamp from existing file
         last_timestamp = self.get_latest_timestamp_from_csv(symbol, frequency)
-        print(f"📊 Using latest timestamp: {datetime.fromtimestamp(last_timestamp / 1000) if last_timestamp else 'None'}")
+        logger.debug("📊 Using latest timestamp: %s", format_csv_datetime(last_timestamp) if last_timestamp else None)
         
         # Get market hours in epoch milliseconds
         start_time_ms, end_time_ms = self.convert_et_to_epoch_ms(target_date)
         
-        # If we have existing data, fetch only from the last timestamp
+        # If we have existing data, fetch only from the candle after the last one saved,
+        # never before target_date's open
         if last_timestamp:
-            start_time_ms = last_timestamp + (60 * 1000)  # Start 1 minute after last data
+            start_time_ms = max(start_time_ms, last_timestamp + FREQUENCY_MS[frequency])
+            if start_time_ms >= end_time_ms:
+                print(f"📊 {symbol}_{frequency} is already up to date for {target_date or 'today'}")
+                return True
         
         # Retrieve price history from Schwab API
-        headers = self.schwab_auth.get_auth_headers()
-        if not headers:
-            print("❌ No valid authentication available")
-            return False
-        
-        url = "https://api.schwabapi.com/marketdata/v1/pricehistory"
-        
         params = {
             'symbol': symbol,
             'periodType': 'day',
@@ -533,15 +638,15 @@ class DataFetcher:
             'needPreviousClose': 'false'
         }
         
-        print(f"📡 Fetching {frequency} price history for {symbol} from Schwab API...")
-        print(f"   URL: {url}")
-        print(f"   Params: {params}")
+        logger.debug("📡 Fetching %s price history for %s from Schwab API...", frequency, symbol)
         
         try:
-            response = requests.get(url, headers=headers, params=params)
+            response = self._request_price_history(params)
+            if response is None:
+                return False
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 
                 if 'candles' in data and data['candles']:
                     candles = data['candles']
@@ -551,17 +656,7 @@ class DataFetcher:
                     new_candles = self.filter_new_data_for_frequency(candles, last_timestamp, frequency)
                     
                     if new_candles:
-                        # Calculate inverse data
-                        inverse_candles = self.calculate_inverse_candles(new_candles)
-                        print(f"🔄 Calculated {len(inverse_candles)} inverse candles from {len(new_candles)} regular candles")
-                        
-                        # Save regular data
-                        regular_success = self.append_to_csv(symbol, frequency, new_candles, inverse=False)
-                        
-                        # Save inverse data
-                        inverse_success = self.append_to_csv(symbol, frequency, inverse_candles, inverse=True)
-                        
-                        if regular_success and inverse_success:
+                        if self._save_regular_and_inverse(symbol, frequency, new_candles):
                             print(f"✅ Data fetch completed for {symbol}_{frequency} (regular + inverse)")
                             return True
                         else:
@@ -582,7 +677,7 @@ class DataFetcher:
             print(f"❌ Error fetching {frequency} price history: {e}")
             return False
 
-    def filter_new_data_for_frequency(self, candles: List[Dict], last_timestamp_ms: Optional[int], frequency: str) -> List[Dict]:
+    def filter_new_data_for_frequency(self, candles: List[Dict], last_timestamp_ms: Optional[int], frequency: str) -> List[Candle]:
         """
         Filter candles for specific frequency to only include new, complete data
         
@@ -592,50 +687,46 @@ class DataFetcher:
             frequency: Data frequency (e.g., '5m', '15m')
             
         Returns:
-            Filtered list of new, complete candles
+            Filtered list of new, complete Candles
         """
         if not candles:
             return []
         
-        # Calculate frequency duration in milliseconds
-        frequency_minutes = int(frequency.replace('m', ''))
-        frequency_ms = frequency_minutes * 60 * 1000
+        frequency_ms = FREQUENCY_MS[frequency]
         
-        # Get current time and calculate the current period boundary
-        current_time = datetime.now(self.et_timezone)
-        current_period_start = self.get_period_boundary(current_time, frequency_minutes)
-        current_period_start_ms = int(current_period_start.timestamp() * 1000)
+        # Current period boundary via integer math (ET offsets are whole hours, so epoch and ET boundaries agree)
+        now_ms = int(time_module.time() * 1000)
+        current_period_start_ms = now_ms - now_ms % frequency_ms
         
-        print(f"🕐 Current time: {current_time.strftime('%H:%M:%S')} ET")
-        print(f"🕐 Current {frequency} period starts: {current_period_start.strftime('%H:%M:%S')} ({current_period_start_ms})")
+        logger.debug("🕐 Current %s period starts: %s", frequency, current_period_start_ms)
         
-        # Filter out the current forming period
-        completed_candles = []
-        for candle in candles:
-            candle_timestamp = candle.get('datetime')
-            if candle_timestamp and candle_timestamp < current_period_start_ms:
-                completed_candles.append(candle)
+        # The API returns candles in ascending time order; only sort if it ever does not
+        candle_times = list(map(_candle_datetime, candles))
+        if not all(a <= b for a, b in pairwise(candle_times)):
+            candles = sorted(candles, key=_candle_datetime)
+            candle_times.sort()
+        
+        # Binary-search the already-recorded prefix and the still-forming tail instead of scanning
+        after_ms = last_timestamp_ms if last_timestamp_ms is not None else 0
+        first_valid = bisect_right(candle_times, 0)
+        first_new = bisect_right(candle_times, after_ms, lo=first_valid)
+        end = bisect_left(candle_times, current_period_start_ms, lo=first_valid)
+        completed_count = end - first_valid
+        new_candles = candles[first_new:end]
         
-        print(f"🔍 Filtered out current forming {frequency} period: {len(candles)} → {len(completed_candles)} completed candles")
+        logger.debug("🔍 Filtered out current forming %s period: %d → %d completed candles",
+                     frequency, len(candles), completed_count)
         
-        # Now filter based on last recorded timestamp
         if last_timestamp_ms is None:
             print("📊 No previous timestamp found, returning all completed candles")
-            new_candles = completed_candles
-        else:
-            new_candles = []
-            for candle in completed_candles:
-                candle_timestamp = candle.get('datetime')
-                if candle_timestamp and candle_timestamp > last_timestamp_ms:
-                    new_candles.append(candle)
         
-        print(f"🔍 Filtered {len(new_candles)} new completed {frequency} candles from {len(completed_candles)} total completed candles")
-        print(f"   Last recorded: {datetime.fromtimestamp(last_timestamp_ms / 1000) if last_timestamp_ms else 'None'}")
+        print(f"🔍 Filtered {len(new_candles)} new completed {frequency} candles from {completed_count} total completed candles")
+        logger.debug("   Last recorded: %s", format_csv_datetime(last_timestamp_ms) if last_timestamp_ms else None)
         
+        new_candles = [Candle.from_api(candle) for candle in new_candles]
         if new_candles:
-            first_new = datetime.fromtimestamp(new_candles[0]['datetime'] / 1000)
-            last_new = datetime.fromtimestamp(new_candles[-1]['datetime'] / 1000)
-            print(f"   New data range: {first_new} to {last_new}")
+            logger.debug("   New data range: %s to %s",
+                         format_csv_datetime(new_candles[0].timestamp), format_csv_datetime(new_candles[-1].timestamp))
         else:
             print("   No new completed candles to save")
         
@@ -687,12 +778,8 @@ class DataFetcher:
         
         # PHASE 1: Fetch previous trading day data
         print(f"\n📡 PHASE 1: Fetching previous trading day data...")
-        previous_market_open = self.et_timezone.localize(
-            datetime.combine(previous_date, self.market_open)
-        )
-        previous_market_close = self.et_timezone.localize(
-            datetime.combine(previous_date, self.market_close)
-        )
+        previous_market_open = datetime.combine(previous_date, self.market_open, tzinfo=self.et_timezone)
+        previous_market_close = datetime.combine(previous_date, self.market_close, tzinfo=self.et_timezone)
         
         previous_start_ms = int(previous_market_open.astimezone(timezone.utc).timestamp() * 1000)
         previous_end_ms = int(previous_market_close.astimezone(timezone.utc).timestamp() * 1000)
@@ -704,13 +791,10 @@ class DataFetcher:
         
         # Check if today is a market day
         if current_time.weekday() < 5:  # Monday = 0, Friday = 4
-            today_market_open = self.et_timezone.localize(
-                datetime.combine(current_time.date(), self.market_open)
-            )
+            today_market_open = datetime.combine(current_time.date(), self.market_open, tzinfo=self.et_timezone)
             
             # Calculate the latest complete candle time
-            frequency_minutes = int(frequency.replace('m', ''))
-            current_period_start = self.get_period_boundary(current_time, frequency_minutes)
+            current_period_start = self.get_period_boundary(current_time, FREQUENCY_MS[frequency] // 60000)
             
             today_start_ms = int(today_market_open.astimezone(timezone.utc).timestamp() * 1000)
             today_end_ms = int(current_period_start.astimezone(timezone.utc).timestamp() * 1000)
@@ -724,36 +808,38 @@ class DataFetcher:
         # Check current data status
         last_timestamp = self.get_latest_timestamp_from_csv(symbol, frequency)
         if last_timestamp:
-            last_datetime = datetime.fromtimestamp(last_timestamp / 1000)
+            last_datetime = format_csv_datetime(last_timestamp)
             print(f"📊 Current latest data: {last_datetime} ({last_timestamp})")
         else:
             print("📊 No existing data found - full bootstrap required")
         
-        # Fetch previous day data
-        print(f"\n🔄 Fetching previous trading day data...")
-        previous_success = self._fetch_historical_range(symbol, frequency, previous_start_ms, previous_end_ms, is_bootstrap=True)
-        
-        if not previous_success:
-            print(f"❌ Failed to fetch previous day data for {symbol}_{frequency}")
-            return False
-        
-        # Fetch today's data if it's a market day
-        today_success = True
+        # Coalesce both phases into a single request: the API omits the overnight
+        # gap (needExtendedHoursData=false), so one range from the previous open
+        # to today's latest complete candle returns the same candles as two calls
+        end_ms = previous_end_ms
         if today_start_ms and today_end_ms and today_start_ms < today_end_ms:
-            print(f"\n🔄 Fetching today's data...")
-            today_success = self._fetch_historical_range(symbol, frequency, today_start_ms, today_end_ms, is_bootstrap=True)
-            
-            if not today_success:
-                print(f"⚠️  Failed to fetch today's data for {symbol}_{frequency} - continuing with previous day data")
+            end_ms = today_end_ms
         else:
             print("📊 No today's data to fetch (weekend or no complete candles yet)")
         
-        overall_success = previous_success and today_success
+        # Resume after the saved data instead of re-requesting (and re-appending) candles we already have.
+        # Bootstrap appends without deduplicating, so it only ever extends the CSV: a gap before the
+        # latest saved candle is not backfilled, and data already current skips the request entirely
+        start_ms = previous_start_ms
+        if last_timestamp and last_timestamp >= previous_start_ms:
+            start_ms = last_timestamp + FREQUENCY_MS[frequency]
+            if start_ms >= end_ms:
+                print(f"📊 {symbol}_{frequency} is already up to date through the latest complete candle")
+                return True
+            print(f"📊 Resuming from {format_csv_datetime(start_ms)} (after existing data)")
+        
+        print(f"\n🔄 Fetching previous trading day + today's data in one request...")
+        overall_success = self._fetch_historical_range(symbol, frequency, start_ms, end_ms, is_bootstrap=True)
         
         if overall_success:
             print(f"✅ Comprehensive bootstrap completed for {symbol}_{frequency}")
         else:
-            print(f"⚠️  Partial bootstrap completed for {symbol}_{frequency}")
+            print(f"❌ Failed to fetch bootstrap data for {symbol}_{frequency}")
         
         return overall_success
 
@@ -771,31 +857,12 @@ class DataFetcher:
         Returns:
             True if successful, False otherwise
         """
-        # Validate frequency
-        valid_frequencies = ['1m', '5m', '10m', '15m', '30m']
-        if frequency not in valid_frequencies:
-            print(f"❌ Invalid frequency: {frequency}. Must be one of {valid_frequencies}")
-            return False
-        
-        # Convert frequency to API parameters
-        frequency_map = {
-            '1m': {'frequencyType': 'minute', 'frequency': 1},
-            '5m': {'frequencyType': 'minute', 'frequency': 5},
-            '10m': {'frequencyType': 'minute', 'frequency': 10},
-            '15m': {'frequencyType': 'minute', 'frequency': 15},
-            '30m': {'frequencyType': 'minute', 'frequency': 30}
-        }
-        
-        freq_params = frequency_map[frequency]
-        
-        # Get authentication headers
-        headers = self.schwab_auth.get_auth_headers()
-        if not headers:
-            print("❌ No valid authentication available")
+        # Validate frequency and convert it to API parameters
+        freq_params = FREQUENCY_PARAMS.get(frequency)
+        if freq_params is None:
+            print(f"❌ Invalid frequency: {frequency}. Must be one of {list(FREQUENCY_PARAMS)}")
             return False
         
-        url = "https://api.schwabapi.com/marketdata/v1/pricehistory"
-        
         params = {
             'symbol': symbol,
             'periodType': 'day',
@@ -810,14 +877,14 @@ class DataFetcher:
         
         operation_type = "Bootstrap" if is_bootstrap else "Historical"
         print(f"📡 {operation_type} fetch: {symbol} {frequency} from Schwab API...")
-        print(f"   URL: {url}")
-        print(f"   Params: {params}")
         
         try:
-            response = requests.get(url, headers=headers, params=params)
+            response = self._request_price_history(params)
+            if response is None:
+                return False
             
             if response.status_code == 200:
-                data = response.json()
+                data = orjson.loads(response.content)
                 
                 if 'candles' in data and data['candles']:
                     candles = data['candles']
@@ -825,7 +892,7 @@ class DataFetcher:
                     
                     # For bootstrap, don't filter by existing data - get all historical data
                     if is_bootstrap:
-                        new_candles = candles
+                        new_candles = [Candle.from_api(candle) for candle in candles]
                         print(f"🔄 Bootstrap mode: Processing all {len(new_candles)} candles")
                     else:
                         # Filter for new data only
@@ -833,17 +900,7 @@ class DataFetcher:
                         new_candles = self.filter_new_data_for_frequency(candles, last_timestamp, frequency)
                     
                     if new_candles:
-                        # Calculate inverse data
-                        inverse_candles = self.calculate_inverse_candles(new_candles)
-                        print(f"🔄 Calculated {len(inverse_candles)} inverse candles from {len(new_candles)} regular candles")
-                        
-                        # Save regular data
-                        regular_success = self.append_to_csv(symbol, frequency, new_candles, inverse=False)
-                        
-                        # Save inverse data
-                        inverse_success = self.append_to_csv(symbol, frequency, inverse_candles, inverse=True)
-                        
-                        if regular_success and inverse_success:
+                        if self._save_regular_and_inverse(symbol, frequency, new_candles):
                             print(f"✅ {operation_type} data saved for {symbol}_{frequency} (regular + inverse)")
                             return True
                         else:
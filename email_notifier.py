@@ -4,14 +4,16 @@ Email Notifier Module
 Handles email notifications for position changes, including LONG and SHORT positions
 """
 
-import os
 import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
-from typing import Dict, Optional
+from typing import Dict, List, Optional, Tuple
+
+from config import Config
 
 class EmailNotifier:
-    def __init__(self):
+    def __init__(self, config: Optional[Config] = None):
+        self.config = config or Config.load()
         self.enabled = False
         self.sender = None
         self.password = None
@@ -22,42 +24,22 @@ class EmailNotifier:
         self._load_credentials()
     
     def _load_credentials(self):
-        """Load email credentials from environment file"""
-        try:
-            env_file = "email_credentials.env"
-            if not os.path.exists(env_file):
-                print("📧 Email credentials file not found, email notifications disabled")
-                return
-            
-            with open(env_file, 'r') as f:
-                for line in f:
-                    line = line.strip()
-                    if '=' in line and not line.startswith('#'):
-                        key, value = line.split('=', 1)
-                        key = key.strip()
-                        value = value.strip()
-                        
-                        if key == "EMAIL_ALERTS_ENABLED":
-                            self.enabled = value.lower() == 'true'
-                        elif key == "SENDER_EMAIL":
-                            self.sender = value
-                        elif key == "SENDER_PASSWORD":
-                            self.password = value
-                        elif key == "TO_EMAILS":
-                            self.recipients = [email.strip() for email in value.split(',')]
-                        elif key == "SMTP_SERVER":
-                            self.smtp_server = value
-                        elif key == "SMTP_PORT":
-                            self.smtp_port = int(value)
-            
-            if self.enabled:
-                print(f"📧 Email notifications enabled for {len(self.recipients)} recipients")
-            else:
-                print("📧 Email notifications disabled in configuration")
-                
-        except Exception as e:
-            print(f"❌ Error loading email credentials: {e}")
-            self.enabled = False
+        """Load email settings from the shared configuration"""
+        if not self.config.email_config_found:
+            print("📧 Email credentials file not found, email notifications disabled")
+            return
+        
+        self.enabled = self.config.email_alerts_enabled
+        self.sender = self.config.sender_email
+        self.password = self.config.sender_password
+        self.recipients = list(self.config.to_emails)
+        self.smtp_server = self.config.smtp_server
+        self.smtp_port = self.config.smtp_port
+        
+        if self.enabled:
+            print(f"📧 Email notifications enabled for {len(self.recipients)} recipients")
+        else:
+            print("📧 Email notifications disabled in configuration")
     
     def test_configuration(self) -> bool:
         """
@@ -70,7 +52,7 @@ class EmailNotifier:
             print("📧 Email notifications are disabled")
             return False
         
-        if not all([self.sender, self.password, self.recipients]):
+        if not self.sender or not self.password or not self.recipients:
             print("❌ Email configuration incomplete")
             return False
         
@@ -106,6 +88,37 @@ class EmailNotifier:
         if not self.enabled:
             return True  # Not an error if disabled
         
+        message = self._build_position_message(symbol, period, position_type, action,
+                                               signal_details, pnl_info, positions)
+        if message is None:
+            return False
+        return self._send_emails([message])
+    
+    def send_position_notifications(self, notifications: List[Dict]) -> bool:
+        """
+        Send several position notifications over a single SMTP connection
+        
+        Args:
+            notifications: send_position_notification keyword arguments, one dict per email
+            
+        Returns:
+            True if all emails sent successfully, False otherwise
+        """
+        if not self.enabled or not notifications:
+            return True  # Not an error if disabled
+        
+        messages = [self._build_position_message(**n) for n in notifications]
+        built = [m for m in messages if m is not None]
+        return self._send_emails(built) and len(built) == len(messages)
+    
+    def _build_position_message(self, symbol: str, period: str, position_type: str, action: str,
+                                signal_details: Dict, pnl_info: Optional[Dict], positions: Dict) -> Optional[Tuple[str, str]]:
+        """
+        Build the subject and body for a position change email
+        
+        Returns:
+            (subject, body) tuple, or None if the message could not be built
+        """
         try:
             # Extract signal details
             price = signal_details.get('price', 'Unknown')
@@ -176,12 +189,11 @@ Position Types: L=LONG(Regular), S=SHORT(Inverse)
 Trading Logic: Open when ALL 3 conditions met, Close when ≤1 condition remains
 """
             
-            # Send email
-            return self._send_email(subject, body)
+            return subject, body
             
         except Exception as e:
             print(f"❌ Error creating position notification: {e}")
-            return False
+            return None
     
     def _send_email(self, subject: str, body: str) -> bool:
         """
@@ -194,25 +206,39 @@ Trading Logic: Open when ALL 3 conditions met, Close when ≤1 condition remains
         Returns:
             True if successful, False otherwise
         """
-        try:
-            # Create message
-            msg = MIMEMultipart()
-            msg['From'] = self.sender
-            msg['To'] = ', '.join(self.recipients)
-            msg['Subject'] = subject
-            
-            # Add body
-            msg.attach(MIMEText(body, 'plain'))
+        return self._send_emails([(subject, body)])
+    
+    def _send_emails(self, messages: List[Tuple[str, str]]) -> bool:
+        """
+        Send emails over one SMTP connection (single STARTTLS and login)
+        
+        Args:
+            messages: List of (subject, body) tuples
             
-            # Send email
-            server = smtplib.SMTP(self.smtp_server, self.smtp_port)
-            server.starttls()
-            server.login(self.sender, self.password)
-            text = msg.as_string()
-            server.sendmail(self.sender, self.recipients, text)
-            server.quit()
+        Returns:
+            True if successful, False otherwise
+        """
+        if not messages:
+            return True
+        
+        try:
+            with smtplib.SMTP(self.smtp_server, self.smtp_port) as server:
+                server.starttls()
+                server.login(self.sender, self.password)
+                
+                for subject, body in messages:
+                    # Create message
+                    msg = MIMEMultipart()
+                    msg['From'] = self.sender
+                    msg['To'] = ', '.join(self.recipients)
+                    msg['Subject'] = subject
+                    
+                    # Add body
+                    msg.attach(MIMEText(body, 'plain'))
+                    
+                    server.sendmail(self.sender, self.recipients, msg.as_string())
             
-            print(f"📧 Email sent successfully to {len(self.recipients)} recipients")
+            print(f"📧 {len(messages)} email(s) sent successfully to {len(self.recipients)} recipients")
             return True
             
         except Exception as e:
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""
+File Utilities Module
+Small file helpers shared by the auth, position tracking and trading modules
+"""
+
+import os
+import tempfile
+
+
+def write_file_atomic(path: str, content: str):
+    """
+    Write a file via a uniquely named temporary sibling and os.replace, so readers
+    never see a partial write and concurrent writers never share a temp file
+    
+    Args:
+        path: Destination file path
+        content: Text to write
+    """
+    directory = os.path.dirname(path) or '.'
+    f = tempfile.NamedTemporaryFile('w', dir=directory, prefix=f".{os.path.basename(path)}.",
+                                    suffix='.tmp', delete=False)
+    try:
+        with f:
+            f.write(content)
+        os.replace(f.name, path)
+    except BaseException:
+        os.unlink(f.name)
+        raise
@@ -5,142 +5,106 @@ Handles all technical indicator calculations (EMA, VWMA, MACD, ROC)
 """
 
 import pandas as pd
-from typing import List, Tuple, Optional
+from typing import Dict, List, Tuple, Optional
 from data_fetcher import DataFetcher
+from config import Config
+
+# Columns that must all be populated before a row can drive position signals
+SIGNAL_COLUMNS = ['ema_7', 'vwma_17', 'macd_line', 'macd_signal', 'roc_8']
+
+# Columns checked by validate_indicator_integrity
+VALIDATED_COLUMNS = ['ema_7', 'macd_line', 'roc_8']
+
+# Trailing rows parsed when looking up the latest indicators (falls back to the full file)
+LATEST_TAIL_ROWS = 64
 
 class IndicatorCalculator:
-    def __init__(self):
-        self.data_fetcher = DataFetcher()
+    def __init__(self, config: Optional[Config] = None):
+        self.data_fetcher = DataFetcher(config)
     
-    def calculate_ema(self, prices: List[float], period: int = 7) -> List[float]:
+    def calculate_ema(self, prices: pd.Series, period: int = 7) -> pd.Series:
         """
-        Calculate Exponential Moving Average (EMA)
+        Calculate Exponential Moving Average (EMA), seeded with the SMA of the first 'period' values
         
         Args:
-            prices: List of closing prices
+            prices: Closing prices (Series or list); leading NaNs are skipped
             period: EMA period (default 7)
             
         Returns:
-            List of EMA values
+            Series of EMA values (NaN until enough data)
         """
-        if len(prices) < period:
-            return [None] * len(prices)
-        
-        ema_values = [None] * len(prices)
-        multiplier = 2.0 / (period + 1)
-        
-        # First EMA value is SMA of first 'period' prices
-        ema_values[period - 1] = sum(prices[:period]) / period
-        
-        # Calculate subsequent EMA values
-        for i in range(period, len(prices)):
-            ema_values[i] = (prices[i] * multiplier) + (ema_values[i - 1] * (1 - multiplier))
-        
-        return ema_values
+        prices = pd.Series(prices, dtype=float)
+        ema = pd.Series(float('nan'), index=prices.index)
+        
+        present = prices.notna().to_numpy()
+        if not present.any():
+            return ema
+        
+        valid = prices.iloc[present.argmax():]
+        if len(valid) < period:
+            return ema
+        
+        # First EMA value is SMA of first 'period' prices; the recursion runs in pandas' C loop
+        seeded = valid.iloc[period - 1:].copy()
+        seeded.iloc[0] = valid.iloc[:period].mean()
+        ema.loc[seeded.index] = seeded.ewm(alpha=2.0 / (period + 1), adjust=False).mean()
+        return ema
 
-    def calculate_vwma(self, prices: List[float], volumes: List[float], period: int = 17) -> List[float]:
+    def calculate_vwma(self, prices: pd.Series, volumes: pd.Series, period: int = 17) -> pd.Series:
         """
         Calculate Volume Weighted Moving Average (VWMA)
         
         Args:
-            prices: List of closing prices
-            volumes: List of volumes
+            prices: Closing prices (Series or list)
+            volumes: Volumes (Series or list)
             period: VWMA period (default 17)
             
         Returns:
-            List of VWMA values
+            Series of VWMA values (NaN until enough data or where volume sums to zero)
         """
-        if len(prices) < period or len(volumes) < period:
-            return [None] * len(prices)
+        prices = pd.Series(prices, dtype=float)
+        volumes = pd.Series(volumes, dtype=float, index=prices.index)
         
-        vwma_values = [None] * len(prices)
-        
-        for i in range(period - 1, len(prices)):
-            # Get the last 'period' prices and volumes
-            period_prices = prices[i - period + 1:i + 1]
-            period_volumes = volumes[i - period + 1:i + 1]
-            
-            # Calculate VWMA: Sum(Price × Volume) / Sum(Volume)
-            weighted_sum = sum(p * v for p, v in zip(period_prices, period_volumes))
-            volume_sum = sum(period_volumes)
-            
-            if volume_sum > 0:
-                vwma_values[i] = weighted_sum / volume_sum
-            else:
-                vwma_values[i] = None
-        
-        return vwma_values
+        # VWMA: Sum(Price × Volume) / Sum(Volume) over a rolling window
+        weighted_sum = (prices * volumes).rolling(period).sum()
+        volume_sum = volumes.rolling(period).sum()
+        return (weighted_sum / volume_sum).where(volume_sum > 0)
 
-    def calculate_macd(self, prices: List[float]) -> Tuple[List[float], List[float]]:
+    def calculate_macd(self, prices: pd.Series) -> Tuple[pd.Series, pd.Series]:
         """
         Calculate MACD (Moving Average Convergence Divergence) and Signal Line
         
         Args:
-            prices: List of closing prices
+            prices: Closing prices (Series or list)
             
         Returns:
-            Tuple of (MACD line, MACD signal line)
+            Tuple of (MACD line, MACD signal line) Series
         """
+        prices = pd.Series(prices, dtype=float)
         if len(prices) < 26:  # Need at least 26 periods for 26 EMA
-            return [None] * len(prices), [None] * len(prices)
-        
-        # Calculate 12 EMA and 26 EMA
-        ema_12 = self.calculate_ema(prices, 12)
-        ema_26 = self.calculate_ema(prices, 26)
-        
-        # Calculate MACD line (12 EMA - 26 EMA)
-        macd_line = []
-        for i in range(len(prices)):
-            if ema_12[i] is not None and ema_26[i] is not None:
-                macd_line.append(ema_12[i] - ema_26[i])
-            else:
-                macd_line.append(None)
-        
-        # Calculate MACD Signal Line (9 EMA of MACD line)
-        # Filter out None values for EMA calculation
-        macd_for_signal = [x for x in macd_line if x is not None]
-        if len(macd_for_signal) < 9:
-            signal_line = [None] * len(prices)
-        else:
-            # Calculate 9 EMA of MACD values
-            signal_ema = self.calculate_ema(macd_for_signal, 9)
-            
-            # Map back to original length with None padding
-            signal_line = [None] * len(prices)
-            signal_start_idx = next(i for i, x in enumerate(macd_line) if x is not None)
-            
-            for i, val in enumerate(signal_ema):
-                if val is not None and signal_start_idx + i < len(signal_line):
-                    signal_line[signal_start_idx + i] = val
+            empty = pd.Series(float('nan'), index=prices.index)
+            return empty, empty.copy()
         
+        # MACD line (12 EMA - 26 EMA); Signal Line is the 9 EMA of the MACD values
+        macd_line = self.calculate_ema(prices, 12) - self.calculate_ema(prices, 26)
+        signal_line = self.calculate_ema(macd_line, 9)
         return macd_line, signal_line
 
-    def calculate_roc(self, prices: List[float], period: int = 8) -> List[float]:
+    def calculate_roc(self, prices: pd.Series, period: int = 8) -> pd.Series:
         """
         Calculate Rate of Change (ROC)
         
         Args:
-            prices: List of closing prices
+            prices: Closing prices (Series or list)
             period: ROC period (default 8)
             
         Returns:
-            List of ROC values as percentages
+            Series of ROC values as percentages (NaN where the past price is zero or missing)
         """
-        if len(prices) < period + 1:
-            return [None] * len(prices)
-        
-        roc_values = [None] * len(prices)
-        
-        for i in range(period, len(prices)):
-            current_price = prices[i]
-            past_price = prices[i - period]
-            
-            if past_price and past_price != 0:
-                roc_values[i] = ((current_price - past_price) / past_price) * 100
-            else:
-                roc_values[i] = None
-        
-        return roc_values
+        prices = pd.Series(prices, dtype=float)
+        past_prices = prices.shift(period)
+        past_prices = past_prices.where(past_prices != 0)
+        return (prices - past_prices) / past_prices * 100
 
     def calculate_all_indicators(self, symbol: str, period: str, inverse: bool = False) -> bool:
         """
@@ -173,8 +137,8 @@ class IndicatorCalculator:
             return False
         
         # Extract prices and volumes, handling any NaN values
-        prices = pd.to_numeric(df['close'], errors='coerce').fillna(0).tolist()
-        volumes = pd.to_numeric(df['volume'], errors='coerce').fillna(0).tolist()
+        prices = pd.to_numeric(df['close'], errors='coerce').fillna(0)
+        volumes = pd.to_numeric(df['volume'], errors='coerce').fillna(0)
         
         # Calculate all indicators
         ema_7 = self.calculate_ema(prices, period=7)
@@ -198,13 +162,13 @@ class IndicatorCalculator:
         
         if success:
             # Count how many indicators were calculated
-            ema_7_count = sum(1 for val in ema_7 if val is not None)
-            ema_12_count = sum(1 for val in ema_12 if val is not None)
-            ema_26_count = sum(1 for val in ema_26 if val is not None)
-            vwma_count = sum(1 for val in vwma_17 if val is not None)
-            macd_count = sum(1 for val in macd_line if val is not None)
-            signal_count = sum(1 for val in macd_signal if val is not None)
-            roc_count = sum(1 for val in roc_8 if val is not None)
+            ema_7_count = ema_7.count()
+            ema_12_count = ema_12.count()
+            ema_26_count = ema_26.count()
+            vwma_count = vwma_17.count()
+            macd_count = macd_line.count()
+            signal_count = macd_signal.count()
+            roc_count = roc_8.count()
             
             print(f"📈 Updated {file_type} indicators for {symbol}_{period}:")
             print(f"   EMA7: {ema_7_count}, EMA12: {ema_12_count}, EMA26: {ema_26_count}")
@@ -290,28 +254,66 @@ class IndicatorCalculator:
         Returns:
             Dictionary with latest indicator values, or None if error
         """
-        df = self.data_fetcher.load_csv_data(symbol, period, inverse=inverse)
+        df = self._load_latest_rows(symbol, period, inverse)
         if df is None or df.empty:
             return None
         
         # Get the latest row with non-empty indicators
-        latest_row = None
-        for i in range(len(df) - 1, -1, -1):
-            row = df.iloc[i]
-            if (pd.notna(row.get('ema_7')) and row.get('ema_7') != '' and
-                pd.notna(row.get('vwma_17')) and row.get('vwma_17') != '' and
-                pd.notna(row.get('macd_line')) and row.get('macd_line') != '' and
-                pd.notna(row.get('macd_signal')) and row.get('macd_signal') != '' and
-                pd.notna(row.get('roc_8')) and row.get('roc_8') != ''):
-                latest_row = row
-                break
-        
-        if latest_row is None:
+        complete = self._complete_indicator_mask(df)
+        if not complete.any():
             return None
         
+        # Index straight to the last complete row rather than copying every complete row first
+        return self._indicators_from_row(df.iloc[complete.to_numpy().nonzero()[0][-1]], symbol, period, inverse)
+
+    def get_latest_indicators_many(self, symbol: str, periods: List[str], inverse: bool = False) -> Dict[str, Optional[dict]]:
+        """
+        Get the latest indicator values for several periods in one vectorized pass
+        
+        Args:
+            symbol: Stock symbol
+            periods: Time periods
+            inverse: Whether to get indicators from inverse price data
+            
+        Returns:
+            Dictionary of period to latest indicator values (None where unavailable)
+        """
+        results = dict.fromkeys(periods)
+        
+        frames = {}
+        for period in periods:
+            df = self._load_latest_rows(symbol, period, inverse)
+            if df is not None and not df.empty:
+                frames[period] = df
+        if not frames:
+            return results
+        
+        combined = pd.concat(frames, names=['tf', None])
+        # Pick the last complete row per timeframe from the mask alone, then copy just those rows
+        complete = self._complete_indicator_mask(combined)
+        latest_rows = combined.loc[complete[complete].groupby(level='tf').tail(1).index]
+        
+        for (period, _), row in latest_rows.iterrows():
+            results[period] = self._indicators_from_row(row, symbol, period, inverse)
+        return results
+
+    def _load_latest_rows(self, symbol: str, period: str, inverse: bool) -> Optional[pd.DataFrame]:
+        """Load the trailing rows of a CSV, or the whole file if none of them has complete indicators"""
+        df = self.data_fetcher.load_csv_tail(symbol, period, LATEST_TAIL_ROWS, inverse=inverse)
+        if df is None or df.empty or self._complete_indicator_mask(df).any():
+            return df
+        return self.data_fetcher.load_csv_data(symbol, period, inverse=inverse)
+
+    def _complete_indicator_mask(self, df: pd.DataFrame) -> pd.Series:
+        """Boolean mask of rows where every signal indicator is populated"""
+        cols = df.reindex(columns=SIGNAL_COLUMNS)
+        return (cols.notna() & (cols != '')).all(axis=1)
+
+    def _indicators_from_row(self, latest_row: pd.Series, symbol: str, period: str, inverse: bool) -> Optional[dict]:
+        """Convert a CSV row into the indicator dictionary used for signals"""
+        file_type = "INVERSE" if inverse else "regular"
         try:
-            file_type = "INVERSE" if inverse else "regular"
-            result = {
+            return {
                 'timestamp': latest_row['timestamp'],
                 'datetime': latest_row['datetime'],
                 'close': float(latest_row['close']),
@@ -324,9 +326,7 @@ class IndicatorCalculator:
                 'roc_8': float(latest_row['roc_8']),
                 'data_type': file_type
             }
-            return result
         except (ValueError, TypeError, KeyError) as e:
-            file_type = "INVERSE" if inverse else "regular"
             print(f"⚠️  Error parsing {file_type} indicators for {symbol}_{period}: {e}")
             return None
 
@@ -362,7 +362,8 @@ class IndicatorCalculator:
             True if indicators are valid, False otherwise
         """
         file_type = "INVERSE" if inverse else "regular"
-        df = self.data_fetcher.load_csv_data(symbol, period, inverse=inverse)
+        # Only the validated indicator columns are parsed
+        df = self.data_fetcher.load_csv_data(symbol, period, inverse=inverse, columns=VALIDATED_COLUMNS)
         if df is None or df.empty:
             print(f"❌ No {file_type} data to validate for {symbol}_{period}")
             return False
@@ -372,26 +373,30 @@ class IndicatorCalculator:
         # Check that we have sufficient data for each indicator
         total_rows = len(df)
         
+        # Count populated values per column in one vectorized pass instead of collecting them
+        values = df[VALIDATED_COLUMNS]
+        counts = (values.notna() & (values != '')).sum()
+        
         # EMA 7 should start after 7 periods
-        ema_7_values = [val for val in df['ema_7'] if val != '' and pd.notna(val)]
-        if len(ema_7_values) > 0 and total_rows >= 7:
+        ema_7_count = counts['ema_7']
+        if ema_7_count > 0 and total_rows >= 7:
             expected_min = total_rows - 7 + 1
-            if len(ema_7_values) < expected_min:
-                issues.append(f"EMA 7 has fewer values than expected: {len(ema_7_values)} < {expected_min}")
+            if ema_7_count < expected_min:
+                issues.append(f"EMA 7 has fewer values than expected: {ema_7_count} < {expected_min}")
         
         # MACD should start after 26 periods (needs 26 EMA)
-        macd_values = [val for val in df['macd_line'] if val != '' and pd.notna(val)]
-        if len(macd_values) > 0 and total_rows >= 26:
+        macd_count = counts['macd_line']
+        if macd_count > 0 and total_rows >= 26:
             expected_min = total_rows - 26 + 1
-            if len(macd_values) < expected_min:
-                issues.append(f"MACD has fewer values than expected: {len(macd_values)} < {expected_min}")
+            if macd_count < expected_min:
+                issues.append(f"MACD has fewer values than expected: {macd_count} < {expected_min}")
         
         # ROC 8 should start after 8 periods
-        roc_values = [val for val in df['roc_8'] if val != '' and pd.notna(val)]
-        if len(roc_values) > 0 and total_rows >= 8:
+        roc_count = counts['roc_8']
+        if roc_count > 0 and total_rows >= 8:
             expected_min = total_rows - 8 + 1
-            if len(roc_values) < expected_min:
-                issues.append(f"ROC 8 has fewer values than expected: {len(roc_values)} < {expected_min}")
+            if roc_count < expected_min:
+                issues.append(f"ROC 8 has fewer values than expected: {roc_count} < {expected_min}")
         
         if issues:
             print(f"❌ {file_type.title()} indicator validation issues for {symbol}_{period}:")
@@ -9,21 +9,40 @@ Handles position signals, P&L tracking, and email notifications for both LONG an
 """
 
 import pandas as pd
-import json
-import os
+import orjson
+import threading
+from collections import namedtuple
 from datetime import datetime
 from typing import Dict, List, Optional, Tuple
-from indicator_calculator import IndicatorCalculator
+from indicator_calculator import IndicatorCalculator, SIGNAL_COLUMNS
 from email_notifier import EmailNotifier
+from file_utils import write_file_atomic
+from config import Config
+
+# Result of one position check; action is 'OPEN', 'CLOSE' or None
+Signal = namedtuple('Signal', 'action price conditions pnl', defaults=(None, None, None, None))
+# LONG (regular data) and SHORT (inverse data) signals for one period
+PeriodSignals = namedtuple('PeriodSignals', 'long short')
+
+NO_SIGNAL = Signal()
+
+# Timeframes with tracked LONG/SHORT positions
+TRACKED_PERIODS = ('5m', '10m', '15m', '30m')
 
 class PositionTracker:
-    def __init__(self):
-        self.indicator_calculator = IndicatorCalculator()
-        self.email_notifier = EmailNotifier()
+    def __init__(self, config: Optional[Config] = None):
+        self.indicator_calculator = IndicatorCalculator(config)
+        self.email_notifier = EmailNotifier(config)
         
         # Position state file for persistence across cron jobs
         self.state_file = 'position_states.json'
         
+        # Guards position state transitions and saves when symbols are processed concurrently
+        self._state_lock = threading.RLock()
+        
+        # Set while replaying history so signals don't rewrite the state file one by one
+        self._defer_saves = False
+        
         # Load existing position states or initialize defaults
         self.position_states, self.opening_prices, self.total_pnl = self._load_position_states()
         
@@ -55,23 +74,23 @@ class PositionTracker:
             '30m': {'LONG': 0.0, 'SHORT': 0.0}
         }
         
-        if os.path.exists(self.state_file):
-            try:
-                with open(self.state_file, 'r') as f:
-                    data = json.load(f)
-                    
-                print(f"📊 Loaded position states from {self.state_file}")
-                return (
-                    data.get('position_states', default_states),
-                    data.get('opening_prices', default_prices),
-                    data.get('total_pnl', default_pnl)
-                )
-            except Exception as e:
-                print(f"⚠️  Error loading position states: {e}, using defaults")
-                return default_states, default_prices, default_pnl
-        else:
+        # Open directly instead of stat-ing first; a missing file means no saved state yet
+        try:
+            with open(self.state_file, 'rb') as f:
+                data = orjson.loads(f.read())
+                
+            print(f"📊 Loaded position states from {self.state_file}")
+            return (
+                data.get('position_states', default_states),
+                data.get('opening_prices', default_prices),
+                data.get('total_pnl', default_pnl)
+            )
+        except FileNotFoundError:
             print(f"📊 No existing position states found, using defaults")
             return default_states, default_prices, default_pnl
+        except Exception as e:
+            print(f"⚠️  Error loading position states: {e}, using defaults")
+            return default_states, default_prices, default_pnl
     
     def _save_position_states(self):
         """
@@ -85,8 +104,10 @@ class PositionTracker:
                 'last_updated': datetime.now().isoformat()
             }
             
-            with open(self.state_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            # Atomic so an interrupted save cannot leave a truncated state file behind
+            with self._state_lock:
+                write_file_atomic(self.state_file, orjson.dumps(
+                    data, option=orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY).decode())
                 
             print(f"💾 Position states saved to {self.state_file}")
         except Exception as e:
@@ -121,7 +142,7 @@ class PositionTracker:
             roc_condition = roc_8 > 0
             
             # Count conditions met
-            conditions_met = sum([ema_condition, macd_condition, roc_condition])
+            conditions_met = ema_condition + macd_condition + roc_condition  # bools add without a temporary list
             
             # Create summary
             summary = f"EMA>VWMA: {'✅' if ema_condition else '❌'} ({ema_7:.2f}>{vwma_17:.2f}), "
@@ -133,7 +154,7 @@ class PositionTracker:
         except (ValueError, KeyError, TypeError) as e:
             return False, False, False, 0, f"Error evaluating conditions: {e}"
 
-    def check_position_signals(self, symbol: str, period: str) -> Dict:
+    def check_position_signals(self, symbol: str, period: str) -> PeriodSignals:
         """
         Check for position signals on both LONG (regular) and SHORT (inverse) positions
         
@@ -142,30 +163,55 @@ class PositionTracker:
             period: Time period
             
         Returns:
-            Dictionary with signal results for both LONG and SHORT
+            PeriodSignals with the LONG and SHORT Signal results
         """
-        results = {
-            'LONG': {'action': None, 'price': None, 'conditions': None, 'pnl': None},
-            'SHORT': {'action': None, 'price': None, 'conditions': None, 'pnl': None}
-        }
-        
         # Get indicators for both regular (LONG) and inverse (SHORT) data
         regular_indicators = self.indicator_calculator.get_latest_indicators(symbol, period, inverse=False)
         inverse_indicators = self.indicator_calculator.get_latest_indicators(symbol, period, inverse=True)
         
-        # Process LONG positions (regular data)
-        if regular_indicators:
-            long_result = self._process_position_type(symbol, period, 'LONG', regular_indicators)
-            results['LONG'] = long_result
+        with self._state_lock:
+            # Process LONG positions (regular data)
+            long_result = NO_SIGNAL
+            if regular_indicators:
+                long_result = self._process_position_type(symbol, period, 'LONG', regular_indicators)
+            
+            # Process SHORT positions (inverse data)
+            short_result = NO_SIGNAL
+            if inverse_indicators:
+                short_result = self._process_position_type(symbol, period, 'SHORT', inverse_indicators)
         
-        # Process SHORT positions (inverse data)
-        if inverse_indicators:
-            short_result = self._process_position_type(symbol, period, 'SHORT', inverse_indicators)
-            results['SHORT'] = short_result
+        return PeriodSignals(long_result, short_result)
+
+    def check_position_signals_many(self, symbol: str, periods: List[str]) -> Dict[str, PeriodSignals]:
+        """
+        Check LONG and SHORT position signals for several periods, locating the
+        latest indicators of all periods in one vectorized pass per data type
         
+        Args:
+            symbol: Stock symbol
+            periods: Time periods
+            
+        Returns:
+            Dictionary of period to PeriodSignals
+        """
+        regular = self.indicator_calculator.get_latest_indicators_many(symbol, periods, inverse=False)
+        inverse = self.indicator_calculator.get_latest_indicators_many(symbol, periods, inverse=True)
+        
+        results = {}
+        with self._state_lock:
+            for period in periods:
+                long_result = NO_SIGNAL
+                if regular[period]:
+                    long_result = self._process_position_type(symbol, period, 'LONG', regular[period])
+                
+                short_result = NO_SIGNAL
+                if inverse[period]:
+                    short_result = self._process_position_type(symbol, period, 'SHORT', inverse[period])
+                
+                results[period] = PeriodSignals(long_result, short_result)
         return results
 
-    def _process_position_type(self, symbol: str, period: str, position_type: str, indicators: dict) -> Dict:
+    def _process_position_type(self, symbol: str, period: str, position_type: str, indicators: dict) -> Signal:
         """
         Process position signals for a specific type (LONG or SHORT)
         
@@ -176,19 +222,18 @@ class PositionTracker:
             indicators: Indicator data
             
         Returns:
-            Dictionary with action, price, conditions, and P&L info
+            Signal with action, price, conditions, and P&L info
         """
-        result = {'action': None, 'price': None, 'conditions': None, 'pnl': None}
-        
         # Evaluate trading conditions
         ema_cond, macd_cond, roc_cond, conditions_met, summary = self.evaluate_trading_conditions(indicators)
-        result['conditions'] = {
+        conditions = {
             'ema_condition': ema_cond,
             'macd_condition': macd_cond,
             'roc_condition': roc_cond,
             'conditions_met': conditions_met,
             'summary': summary
         }
+        result = Signal(conditions=conditions)
         
         current_state = self.position_states[period][position_type]
         current_price = float(indicators['close'])
@@ -203,8 +248,7 @@ class PositionTracker:
             # Open position when ALL 3 conditions are met
             self.position_states[period][position_type] = 'OPENED'
             self.opening_prices[period][position_type] = current_price
-            result['action'] = 'OPEN'
-            result['price'] = current_price
+            result = Signal('OPEN', current_price, conditions)
             
             # Enhanced logging with position constraints
             other_type = 'SHORT' if position_type == 'LONG' else 'LONG'
@@ -215,7 +259,8 @@ class PositionTracker:
             print(f"   📊 Constraint: 1 {position_type} + 1 {other_type} max per timeframe - Currently: {position_type}=OPEN, {other_type}={other_state}")
             
             # Save state after opening position
-            self._save_position_states()
+            if not self._defer_saves:
+                self._save_position_states()
             
         elif current_state == 'OPENED' and conditions_met <= 1:
             # Close position when 2 or more conditions fail (≤1 condition remaining)
@@ -237,15 +282,13 @@ class PositionTracker:
             # Update total P&L
             self.total_pnl[period][position_type] += pnl_dollar
             
-            result['action'] = 'CLOSE'
-            result['price'] = current_price
-            result['pnl'] = {
+            result = Signal('CLOSE', current_price, conditions, {
                 'opening_price': opening_price,
                 'closing_price': current_price,
                 'pnl_dollar': pnl_dollar,
                 'pnl_percent': pnl_percent,
                 'total_pnl': self.total_pnl[period][position_type]
-            }
+            })
             
             # Reset opening price
             self.opening_prices[period][position_type] = None
@@ -254,7 +297,8 @@ class PositionTracker:
             print(f"🚨 {position_type} POSITION CLOSED: {symbol}_{period} at {current_price:.4f} {pnl_emoji} ${pnl_dollar:.4f} ({pnl_percent:.2f}%)")
             
             # Save state after closing position
-            self._save_position_states()
+            if not self._defer_saves:
+                self._save_position_states()
         
         elif current_state == 'OPENED' and conditions_met == 3:
             # Position already open with all conditions still met - no action needed
@@ -280,27 +324,26 @@ class PositionTracker:
         Returns:
             True if any signals were found and processed, False otherwise
         """
-        signals_found = False
+        pending = []
         
-        for period in ['5m', '10m', '15m', '30m']:
-            # Check signals for both LONG and SHORT positions
-            period_signals = self.check_position_signals(symbol, period)
-            
-            # Process LONG signals
-            long_signal = period_signals['LONG']
-            if long_signal['action']:
-                signals_found = True
-                self._send_position_notification(symbol, period, 'LONG', long_signal)
+        # Check signals for both LONG and SHORT positions on every timeframe
+        all_signals = self.check_position_signals_many(symbol, TRACKED_PERIODS)
+        
+        for period, period_signals in all_signals.items():
+            # Queue LONG signals
+            if period_signals.long.action:
+                pending.append((period, 'LONG', period_signals.long))
             
-            # Process SHORT signals
-            short_signal = period_signals['SHORT']
-            if short_signal['action']:
-                signals_found = True
-                self._send_position_notification(symbol, period, 'SHORT', short_signal)
+            # Queue SHORT signals
+            if period_signals.short.action:
+                pending.append((period, 'SHORT', period_signals.short))
+        
+        # One SMTP session for every signal found this check
+        self.send_position_notifications(symbol, pending)
         
-        return signals_found
+        return bool(pending)
 
-    def _send_position_notification(self, symbol: str, period: str, position_type: str, signal_data: dict):
+    def _send_position_notification(self, symbol: str, period: str, position_type: str, signal_data: Signal):
         """
         Send email notification for position changes
         
@@ -310,32 +353,50 @@ class PositionTracker:
             position_type: 'LONG' or 'SHORT'
             signal_data: Signal information
         """
-        action = signal_data['action']
-        price = signal_data['price']
-        conditions = signal_data['conditions']
-        pnl_info = signal_data.get('pnl')
+        self.send_position_notifications(symbol, [(period, position_type, signal_data)])
+
+    def send_position_notifications(self, symbol: str, pending: List[Tuple[str, str, Signal]]) -> Dict:
+        """
+        Send email notifications for several position changes over one SMTP session
         
+        Args:
+            symbol: Stock symbol
+            pending: List of (period, position_type, signal) tuples
+            
+        Returns:
+            Current position status (as from get_position_status), for reuse by callers
+        """
         # Get current position status for context
         positions = self.get_position_status()
-        
-        try:
-            self.email_notifier.send_position_notification(
-                symbol=symbol,
-                period=period,
-                position_type=position_type,  # NEW: specify LONG or SHORT
-                action=action,
-                signal_details={
+        if not pending:
+            return positions
+        timestamp = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+        
+        notifications = []
+        for period, position_type, (action, price, conditions, pnl_info) in pending:
+            notifications.append({
+                'symbol': symbol,
+                'period': period,
+                'position_type': position_type,  # NEW: specify LONG or SHORT
+                'action': action,
+                'signal_details': {
                     'price': price,
                     'conditions_met': conditions['conditions_met'],
                     'condition_summary': conditions['summary'],
-                    'timestamp': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                    'timestamp': timestamp
                 },
-                pnl_info=pnl_info,
-                positions=positions
-            )
-            print(f"📧 Email notification sent for {position_type} {action} signal")
+                'pnl_info': pnl_info,
+                'positions': positions
+            })
+        
+        try:
+            self.email_notifier.send_position_notifications(notifications)
+            for period, position_type, signal in pending:
+                print(f"📧 Email notification sent for {position_type} {signal.action} signal")
         except Exception as e:
             print(f"❌ Failed to send email notification: {e}")
+        
+        return positions
 
     def analyze_historical_positions(self, symbol: str, suppress_emails: bool = True) -> Dict:
         """
@@ -354,44 +415,48 @@ class PositionTracker:
         open_signals = {'LONG': 0, 'SHORT': 0}
         close_signals = {'LONG': 0, 'SHORT': 0}
         
-        # Reset position states for fresh analysis
-        for period in ['5m', '10m', '15m', '30m']:
-            self.position_states[period]['LONG'] = 'CLOSED'
-            self.position_states[period]['SHORT'] = 'CLOSED'
-            self.opening_prices[period]['LONG'] = None
-            self.opening_prices[period]['SHORT'] = None
-            self.total_pnl[period]['LONG'] = 0.0
-            self.total_pnl[period]['SHORT'] = 0.0
-        
-        # Save reset state
-        self._save_position_states()
-        
-        for period in ['5m', '10m', '15m', '30m']:
-            print(f"\n📊 Analyzing {period} historical data...")
-            
-            # Load both regular (LONG) and inverse (SHORT) data
-            df_regular = self.indicator_calculator.data_fetcher.load_csv_data(symbol, period, inverse=False)
-            df_inverse = self.indicator_calculator.data_fetcher.load_csv_data(symbol, period, inverse=True)
-            
-            if df_regular is None or df_regular.empty:
-                print(f"❌ No regular data available for {period}")
-                continue
+        # Replay every row, then write the state file once instead of per signal
+        with self._state_lock:
+            self._defer_saves = True
+            try:
+                # Reset position states for fresh analysis
+                for period in TRACKED_PERIODS:
+                    self.position_states[period]['LONG'] = 'CLOSED'
+                    self.position_states[period]['SHORT'] = 'CLOSED'
+                    self.opening_prices[period]['LONG'] = None
+                    self.opening_prices[period]['SHORT'] = None
+                    self.total_pnl[period]['LONG'] = 0.0
+                    self.total_pnl[period]['SHORT'] = 0.0
                 
-            if df_inverse is None or df_inverse.empty:
-                print(f"❌ No inverse data available for {period}")
-                continue
-            
-            # Process historical signals for both types
-            long_signals = self._analyze_historical_for_type(symbol, period, 'LONG', df_regular, suppress_emails)
-            short_signals = self._analyze_historical_for_type(symbol, period, 'SHORT', df_inverse, suppress_emails)
-            
-            # Update totals
-            total_signals['LONG'] += long_signals['total']
-            total_signals['SHORT'] += short_signals['total']
-            open_signals['LONG'] += long_signals['opens']
-            open_signals['SHORT'] += short_signals['opens']
-            close_signals['LONG'] += long_signals['closes']
-            close_signals['SHORT'] += short_signals['closes']
+                for period in TRACKED_PERIODS:
+                    print(f"\n📊 Analyzing {period} historical data...")
+                    
+                    # Load both regular (LONG) and inverse (SHORT) data
+                    df_regular = self.indicator_calculator.data_fetcher.load_csv_data(symbol, period, inverse=False)
+                    df_inverse = self.indicator_calculator.data_fetcher.load_csv_data(symbol, period, inverse=True)
+                    
+                    if df_regular is None or df_regular.empty:
+                        print(f"❌ No regular data available for {period}")
+                        continue
+                        
+                    if df_inverse is None or df_inverse.empty:
+                        print(f"❌ No inverse data available for {period}")
+                        continue
+                    
+                    # Process historical signals for both types
+                    long_signals = self._analyze_historical_for_type(symbol, period, 'LONG', df_regular, suppress_emails)
+                    short_signals = self._analyze_historical_for_type(symbol, period, 'SHORT', df_inverse, suppress_emails)
+                    
+                    # Update totals
+                    total_signals['LONG'] += long_signals['total']
+                    total_signals['SHORT'] += short_signals['total']
+                    open_signals['LONG'] += long_signals['opens']
+                    open_signals['SHORT'] += short_signals['opens']
+                    close_signals['LONG'] += long_signals['closes']
+                    close_signals['SHORT'] += short_signals['closes']
+            finally:
+                self._defer_saves = False
+                self._save_position_states()
         
         # Summary
         print(f"\n🎯 Historical Analysis Summary for {symbol}:")
@@ -428,36 +493,35 @@ class PositionTracker:
         
         print(f"   📊 Processing {len(df)} rows of {position_type} data...")
         
-        for index, row in df.iterrows():
-            # Skip rows without complete indicators
-            if (pd.isna(row.get('ema_7')) or row.get('ema_7') == '' or
-                pd.isna(row.get('vwma_17')) or row.get('vwma_17') == '' or
-                pd.isna(row.get('macd_line')) or row.get('macd_line') == '' or
-                pd.isna(row.get('macd_signal')) or row.get('macd_signal') == '' or
-                pd.isna(row.get('roc_8')) or row.get('roc_8') == ''):
-                continue
-            
+        # Skip rows without complete indicators up front, then walk plain tuples
+        # (iterrows would build a Series per row)
+        columns = ['timestamp', 'datetime', 'close'] + SIGNAL_COLUMNS
+        signal_values = df.reindex(columns=SIGNAL_COLUMNS)
+        complete = (signal_values.notna() & (signal_values != '')).all(axis=1)
+        rows = df.reindex(columns=columns)[complete].itertuples(index=False, name=None)
+        
+        for timestamp, dt, close, ema_7, vwma_17, macd_line, macd_signal, roc_8 in rows:
             # Create indicators dictionary
             indicators = {
-                'timestamp': row['timestamp'],
-                'datetime': row['datetime'],
-                'close': float(row['close']),
-                'ema_7': float(row['ema_7']),
-                'vwma_17': float(row['vwma_17']),
-                'macd_line': float(row['macd_line']),
-                'macd_signal': float(row['macd_signal']),
-                'roc_8': float(row['roc_8']),
+                'timestamp': timestamp,
+                'datetime': dt,
+                'close': float(close),
+                'ema_7': float(ema_7),
+                'vwma_17': float(vwma_17),
+                'macd_line': float(macd_line),
+                'macd_signal': float(macd_signal),
+                'roc_8': float(roc_8),
                 'data_type': position_type
             }
             
             # Check for signals
             signal_result = self._process_position_type(symbol, period, position_type, indicators)
             
-            if signal_result['action']:
+            if signal_result.action:
                 signals['total'] += 1
-                if signal_result['action'] == 'OPEN':
+                if signal_result.action == 'OPEN':
                     signals['opens'] += 1
-                elif signal_result['action'] == 'CLOSE':
+                elif signal_result.action == 'CLOSE':
                     signals['closes'] += 1
                 
                 # Send historical email notification (only if not suppressed)
@@ -467,7 +531,7 @@ class PositionTracker:
                     except Exception as e:
                         print(f"⚠️  Email notification failed: {e}")
                 else:
-                    print(f"📧 Email suppressed for historical {signal_result['action']} signal")
+                    print(f"📧 Email suppressed for historical {signal_result.action} signal")
         
         print(f"   ✅ {position_type} {period}: {signals['total']} signals ({signals['opens']} opens, {signals['closes']} closes)")
         return signals
@@ -494,7 +558,7 @@ class PositionTracker:
             Detailed position information
         """
         status = {}
-        for period in ['5m', '10m', '15m', '30m']:
+        for period in TRACKED_PERIODS:
             status[period] = {
                 'LONG': {
                     'state': self.position_states[period]['LONG'],
@@ -561,7 +625,7 @@ class PositionTracker:
         
         constraints_valid = True
         
-        for period in ['5m', '10m', '15m', '30m']:
+        for period in TRACKED_PERIODS:
             long_state = self.position_states[period]['LONG']
             short_state = self.position_states[period]['SHORT']
             long_price = self.opening_prices[period]['LONG']
@@ -619,7 +683,7 @@ class PositionTracker:
             'concurrent_timeframes': []  # Timeframes with both LONG and SHORT open
         }
         
-        for period in ['5m', '10m', '15m', '30m']:
+        for period in TRACKED_PERIODS:
             long_open = self.position_states[period]['LONG'] == 'OPENED'
             short_open = self.position_states[period]['SHORT'] == 'OPENED'
             
@@ -650,7 +714,7 @@ class PositionTracker:
         # Get position summary first
         summary = self.get_position_summary()
         
-        for period in ['5m', '10m', '15m', '30m']:
+        for period in TRACKED_PERIODS:
             long_state = self.position_states[period]['LONG']
             short_state = self.position_states[period]['SHORT']
             long_price = self.opening_prices[period]['LONG']
@@ -673,12 +737,13 @@ class PositionTracker:
                 print(f"   💤 No positions open (1 LONG + 1 SHORT available)")
         
         # Show file info
-        if os.path.exists(self.state_file):
-            with open(self.state_file, 'r') as f:
-                data = json.load(f)
-                last_updated = data.get('last_updated', 'Unknown')
-                print(f"\n💾 State file: {self.state_file}")
-                print(f"📅 Last updated: {last_updated}")
+        try:
+            with open(self.state_file, 'rb') as f:
+                data = orjson.loads(f.read())
+            print(f"\n💾 State file: {self.state_file}")
+            print(f"📅 Last updated: {data.get('last_updated', 'Unknown')}")
+        except FileNotFoundError:
+            pass
         
         # Show constraint summary
         print(f"\n📊 Position Constraint Summary:")
@@ -5,42 +5,156 @@ Designed for cron-based execution at specific intervals
 Handles: data fetching → indicator calculation → position analysis
 """
 
+import os
 import sys
+import orjson
+import sched
+import signal
+import asyncio
+import logging
+import threading
 import argparse
+import time as time_module
+from concurrent.futures import ProcessPoolExecutor
+from functools import cached_property
 from datetime import datetime, time, timedelta
-import pytz
-from typing import Optional
+from zoneinfo import ZoneInfo
+from typing import Dict, List, Optional
+
+# Modular components are imported on first use (see the cached properties below)
+from config import Config
+
+# Market hours and timezone, resolved once per process
+ET_TIMEZONE = ZoneInfo('America/New_York')
+MARKET_OPEN_S = 9 * 3600 + 30 * 60  # 9:30 AM ET, seconds from midnight
+MARKET_CLOSE_S = 16 * 3600  # 4:00 PM ET, seconds from midnight
+
+FREQUENCIES = ['5m', '10m', '15m', '30m']
+DAEMON_FETCH_DELAY_S = 5  # Let the bar close at the API before fetching it
+EVENT_LOG_DIR = 'logs'
+
+# Static banners, built once instead of on every run
+BANNER_40 = "=" * 40
+BANNER_60 = "=" * 60
+BANNER_75 = "=" * 75
+
+logger = logging.getLogger(__name__)
+
+
+def is_market_hours(now: datetime) -> bool:
+    """Check whether an ET datetime falls within market hours"""
+    seconds = now.hour * 3600 + now.minute * 60 + now.second
+    return MARKET_OPEN_S <= seconds <= MARKET_CLOSE_S
+
+
+def is_market_day(now: datetime) -> bool:
+    """Check whether an ET datetime falls on a market day (weekday)"""
+    return now.weekday() < 5  # Monday = 0, Friday = 4
+
+
+def is_market_open(now: datetime) -> bool:
+    """Check whether an ET datetime falls on a weekday within market hours"""
+    return is_market_day(now) and is_market_hours(now)
+
+
+def _calculate_indicators(symbol: str, frequency: str) -> bool:
+    """Calculate regular and inverse indicators for one frequency (runs in a worker process)"""
+    from indicator_calculator import IndicatorCalculator
+    calculator = IndicatorCalculator()
+    regular_indicators = calculator.calculate_all_indicators(symbol, frequency, inverse=False)
+    inverse_indicators = calculator.calculate_all_indicators(symbol, frequency, inverse=True)
+    return regular_indicators and inverse_indicators
 
-# Import all our modular components
-from data_fetcher import DataFetcher
-from indicator_calculator import IndicatorCalculator
-from position_tracker import PositionTracker
-from email_notifier import EmailNotifier
-from schwab_auth import SchwabAuth
 
 class ScheduledCoordinator:
     def __init__(self):
-        # Initialize all modular components
-        self.data_fetcher = DataFetcher()
-        self.indicator_calculator = IndicatorCalculator()
-        self.position_tracker = PositionTracker()
-        self.email_notifier = EmailNotifier()
-        self.schwab_auth = SchwabAuth()
-        
-        # Market hours and timezone
-        self.et_timezone = pytz.timezone('US/Eastern')
-        self.market_open = time(9, 30)  # 9:30 AM ET
-        self.market_close = time(16, 0)  # 4:00 PM ET
-
-    def is_market_hours(self) -> bool:
-        """Check if current time is within market hours"""
-        current_time = datetime.now(self.et_timezone).time()
-        return self.market_open <= current_time <= self.market_close
-
-    def is_market_day(self) -> bool:
-        """Check if today is a market day (weekday)"""
-        current_date = datetime.now(self.et_timezone)
-        return current_date.weekday() < 5  # Monday = 0, Friday = 4
+        # Shared configuration; components are created lazily from it
+        self.config = Config.load()
+        
+        # Market timezone
+        self.et_timezone = ET_TIMEZONE
+        
+        # Successful auth checks are trusted until shortly before token expiry
+        self._auth_ok_until: Optional[datetime] = None
+        
+        # Append-only JSON Lines event log, open only while running as a daemon
+        self._event_log = None
+        
+        # Last candle timestamp indicators were calculated through, per (symbol, frequency)
+        self._indicators_through: Dict[tuple, int] = {}
+
+    @cached_property
+    def http(self):
+        """Keep-alive HTTP session shared by every API client"""
+        from schwab_auth import create_http_session
+        return create_http_session()
+
+    @cached_property
+    def data_fetcher(self):
+        """Data fetcher, imported and created on first use"""
+        from data_fetcher import DataFetcher
+        return DataFetcher(self.config, session=self.http)
+
+    @cached_property
+    def indicator_calculator(self):
+        """Indicator calculator, imported and created on first use"""
+        from indicator_calculator import IndicatorCalculator
+        return IndicatorCalculator(self.config)
+
+    @cached_property
+    def position_tracker(self):
+        """Position tracker, imported and created on first use"""
+        from position_tracker import PositionTracker
+        return PositionTracker(self.config)
+
+    @cached_property
+    def email_notifier(self):
+        """Email notifier, imported and created on first use"""
+        from email_notifier import EmailNotifier
+        return EmailNotifier(self.config)
+
+    @property
+    def schwab_auth(self):
+        """The fetcher's auth, shared so concurrent token checks refresh only once"""
+        return self.data_fetcher.schwab_auth
+
+    def load_components(self):
+        """Create every lazy component now, before the coordinator is shared across threads"""
+        for name in ('data_fetcher', 'indicator_calculator', 'position_tracker', 'email_notifier'):
+            getattr(self, name)
+
+    def close(self):
+        """Close the shared HTTP session if one was created"""
+        if 'http' in self.__dict__:
+            self.http.close()
+
+    def is_market_hours(self, now: Optional[datetime] = None) -> bool:
+        """Check if current time (or the given ET datetime) is within market hours"""
+        return is_market_hours(now if now is not None else datetime.now(ET_TIMEZONE))
+
+    def is_market_day(self, now: Optional[datetime] = None) -> bool:
+        """Check if today (or the given ET datetime) is a market day (weekday)"""
+        return is_market_day(now if now is not None else datetime.now(ET_TIMEZONE))
+
+    def _log_event(self, symbol: str, frequency: str, stage: str, **fields):
+        """Append one structured event to the daemon's JSON Lines log, if open"""
+        if self._event_log is None:
+            return
+        record = {'ts': time_module.time(), 'sym': symbol, 'freq': frequency, 'stage': stage, **fields}
+        self._event_log.write(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE | orjson.OPT_SERIALIZE_NUMPY))
+
+    def check_authentication(self) -> bool:
+        """Check authentication, reusing a successful result until the token nears expiry"""
+        if self._auth_ok_until and datetime.now() < self._auth_ok_until:
+            return True
+        
+        if not self.schwab_auth.is_authenticated():
+            self._auth_ok_until = None
+            return False
+        
+        expires_at = self.schwab_auth.get_token_info().get('expires_at')
+        self._auth_ok_until = expires_at - timedelta(minutes=2) if expires_at else None
+        return True
 
     def run_scheduled_execution(self, symbol: str, frequency: str) -> bool:
         """
@@ -53,93 +167,132 @@ class ScheduledCoordinator:
         Returns:
             True if successful, False otherwise
         """
-        current_time = datetime.now(self.et_timezone)
-        print(f"\n🕒 Scheduled Execution: {current_time.strftime('%Y-%m-%d %H:%M:%S')} ET")
-        print(f"📊 Symbol: {symbol} | Frequency: {frequency}")
-        print("=" * 60)
-        
-        # Check if it's a valid market day and time
-        if not self.is_market_day():
-            print("📅 Not a market day (weekend). Skipping execution.")
-            return True
+        return asyncio.run(self.run_scheduled_execution_async(symbol, frequency))
+
+    async def run_scheduled_execution_async(self, symbol: str, frequency: str) -> bool:
+        """
+        Async scheduled execution: the token check runs concurrently with the
+        data fetch so the auth round trip overlaps the fetcher's CSV read
+        
+        Args:
+            symbol: Stock symbol (e.g., 'SPY')
+            frequency: Data frequency ('5m', '10m', '15m', '30m')
+            
+        Returns:
+            True if successful, False otherwise
+        """
+        current_time = datetime.now(ET_TIMEZONE)
+        logger.info("\n🕒 Scheduled Execution: %s ET\n📊 Symbol: %s | Frequency: %s\n%s",
+                    current_time.strftime('%Y-%m-%d %H:%M:%S'), symbol, frequency, BANNER_60)
         
-        if not self.is_market_hours():
-            print("🕒 Outside market hours. Skipping execution.")
+        # Check if it's a valid market day and time (reusing the single clock read)
+        if not self.is_market_day(current_time):
+            logger.info("📅 Not a market day (weekend). Skipping execution.")
             return True
         
-        # Check authentication
-        if not self.schwab_auth.is_authenticated():
-            print("❌ Authentication failed. Skipping execution.")
-            return False
+        if not self.is_market_hours(current_time):
+            logger.info("🕒 Outside market hours. Skipping execution.")
+            return True
         
         overall_success = True
         
         try:
-            # Step 1: Fetch data at specified frequency
-            print(f"\n📡 Step 1: Fetching {frequency} data...")
-            fetch_success = self.data_fetcher.fetch_data_at_frequency(symbol, frequency)
+            # Step 1: Fetch data at specified frequency while checking authentication
+            logger.info("\n📡 Step 1: Fetching %s data...", frequency)
+            # Resolve the lazy fetcher here so both worker threads share one instance
+            data_fetcher = self.data_fetcher
+            auth_valid, fetch_success = await asyncio.gather(
+                asyncio.to_thread(self.check_authentication),
+                asyncio.to_thread(data_fetcher.fetch_data_at_frequency, symbol, frequency)
+            )
             
+            if not auth_valid:
+                logger.error("❌ Authentication failed. Skipping execution.")
+                self._log_event(symbol, frequency, 'auth', ok=False)
+                return False
+            
+            self._log_event(symbol, frequency, 'fetch', ok=bool(fetch_success))
             if not fetch_success:
-                print(f"❌ Failed to fetch {frequency} data")
+                logger.error("❌ Failed to fetch %s data", frequency)
                 overall_success = False
             else:
-                print(f"✅ {frequency} data fetch completed")
+                logger.info("✅ %s data fetch completed", frequency)
             
             # Step 2: Calculate indicators for the frequency
-            print(f"\n📈 Step 2: Calculating {frequency} indicators...")
-            
-            # Calculate indicators for both regular and inverse data
-            regular_indicators = self.indicator_calculator.calculate_all_indicators(symbol, frequency, inverse=False)
-            inverse_indicators = self.indicator_calculator.calculate_all_indicators(symbol, frequency, inverse=True)
+            logger.info("\n📈 Step 2: Calculating %s indicators...", frequency)
             
-            indicators_success = regular_indicators and inverse_indicators
+            # Skip the full-file recalculation when the fetch appended no new candles
+            latest_timestamp = data_fetcher.get_latest_timestamp_from_csv(symbol, frequency)
+            if latest_timestamp is not None and self._indicators_through.get((symbol, frequency)) == latest_timestamp:
+                logger.info("📊 No new %s candles, indicators already up to date", frequency)
+                indicators_success = True
+            else:
+                # Calculate indicators for both regular and inverse data
+                regular_indicators = self.indicator_calculator.calculate_all_indicators(symbol, frequency, inverse=False)
+                inverse_indicators = self.indicator_calculator.calculate_all_indicators(symbol, frequency, inverse=True)
+                
+                indicators_success = regular_indicators and inverse_indicators
+                if indicators_success:
+                    self._indicators_through[(symbol, frequency)] = latest_timestamp
             
+            self._log_event(symbol, frequency, 'indicators', ok=bool(indicators_success))
             if not indicators_success:
-                print(f"❌ Failed to calculate {frequency} indicators")
+                logger.error("❌ Failed to calculate %s indicators", frequency)
                 overall_success = False
             else:
-                print(f"✅ {frequency} indicator calculation completed")
+                logger.info("✅ %s indicator calculation completed", frequency)
             
             # Step 3: Analyze position signals for this frequency
-            print(f"\n🎯 Step 3: Analyzing {frequency} position signals...")
+            logger.info("\n🎯 Step 3: Analyzing %s position signals...", frequency)
             
             # Check for position signals on this specific timeframe
             period_signals = self.position_tracker.check_position_signals(symbol, frequency)
             
             signals_found = False
+            pending = []
             
             # Process LONG signals
-            long_signal = period_signals['LONG']
-            if long_signal['action']:
+            long_signal = period_signals.long
+            if long_signal.action:
                 signals_found = True
-                self.position_tracker._send_position_notification(symbol, frequency, 'LONG', long_signal)
-                print(f"🚨 LONG {long_signal['action']} signal detected for {symbol}_{frequency}")
+                pending.append((frequency, 'LONG', long_signal))
+                logger.info("🚨 LONG %s signal detected for %s_%s", long_signal.action, symbol, frequency)
             
             # Process SHORT signals
-            short_signal = period_signals['SHORT']
-            if short_signal['action']:
+            short_signal = period_signals.short
+            if short_signal.action:
                 signals_found = True
-                self.position_tracker._send_position_notification(symbol, frequency, 'SHORT', short_signal)
-                print(f"🚨 SHORT {short_signal['action']} signal detected for {symbol}_{frequency}")
+                pending.append((frequency, 'SHORT', short_signal))
+                logger.info("🚨 SHORT %s signal detected for %s_%s", short_signal.action, symbol, frequency)
+            
+            # Notify LONG and SHORT changes over a single SMTP session
+            positions = self.position_tracker.send_position_notifications(symbol, pending)
             
+            self._log_event(symbol, frequency, 'signals', long=long_signal.action, short=short_signal.action,
+                            long_price=long_signal.price, short_price=short_signal.price)
             if not signals_found:
-                print(f"📊 No position signals for {symbol}_{frequency}")
+                logger.info("📊 No position signals for %s_%s", symbol, frequency)
             
-            # Show current position status for this timeframe
-            positions = self.position_tracker.get_position_status()
-            print(f"📊 Current {frequency} Position: {positions.get(frequency, 'N/A')}")
+            # Show current position status for this timeframe (already built for the notifications)
+            logger.info("📊 Current %s Position: %s", frequency, positions.get(frequency, 'N/A'))
             
             # Step 4: Summary
-            print(f"\n📈 Scheduled Execution Summary:")
-            print(f"   Data Fetch ({frequency}): {'✅ Success' if fetch_success else '❌ Failed'}")
-            print(f"   Indicators ({frequency}): {'✅ Success' if indicators_success else '❌ Failed'}")
-            print(f"   Position Signals: {'🚨 Found' if signals_found else '📊 None'}")
-            print(f"   Overall: {'✅ Success' if overall_success else '❌ Partial failure'}")
+            logger.info("\n📈 Scheduled Execution Summary:\n"
+                        "   Data Fetch (%s): %s\n"
+                        "   Indicators (%s): %s\n"
+                        "   Position Signals: %s\n"
+                        "   Overall: %s",
+                        frequency, '✅ Success' if fetch_success else '❌ Failed',
+                        frequency, '✅ Success' if indicators_success else '❌ Failed',
+                        '🚨 Found' if signals_found else '📊 None',
+                        '✅ Success' if overall_success else '❌ Partial failure')
             
         except Exception as e:
-            print(f"❌ Error during scheduled execution: {e}")
+            logger.error("❌ Error during scheduled execution: %s", e)
+            self._log_event(symbol, frequency, 'error', error=str(e))
             overall_success = False
         
+        self._log_event(symbol, frequency, 'done', ok=overall_success)
         return overall_success
 
     def run_bootstrap(self, symbol: str, frequency: str) -> bool:
@@ -154,42 +307,120 @@ class ScheduledCoordinator:
         Returns:
             True if successful, False otherwise
         """
-        print(f"\n🔄 Bootstrap Mode: Historical data + position analysis for {symbol}_{frequency}")
-        print("=" * 75)
+        logger.info("\n🔄 Bootstrap Mode: Historical data + position analysis for %s_%s", symbol, frequency)
+        logger.info(BANNER_75)
         
         # Step 1: Fetch bootstrap data from previous trading day 9:30AM ET
-        print(f"📡 Step 1: Fetching bootstrap data...")
+        logger.info("📡 Step 1: Fetching bootstrap data...")
         fetch_success = self.data_fetcher.fetch_bootstrap_data(symbol, frequency)
         
         if not fetch_success:
-            print(f"❌ Bootstrap data fetch failed for {symbol}_{frequency}")
+            logger.error("❌ Bootstrap data fetch failed for %s_%s", symbol, frequency)
             return False
         
         # Step 2: Calculate indicators for both regular and inverse data
-        print(f"\n📈 Step 2: Calculating indicators...")
+        logger.info("\n📈 Step 2: Calculating indicators...")
         regular_indicators = self.indicator_calculator.calculate_all_indicators(symbol, frequency, inverse=False)
         inverse_indicators = self.indicator_calculator.calculate_all_indicators(symbol, frequency, inverse=True)
         
         indicators_success = regular_indicators and inverse_indicators
         
         if not indicators_success:
-            print(f"❌ Failed to calculate indicators for {symbol}_{frequency}")
+            logger.error("❌ Failed to calculate indicators for %s_%s", symbol, frequency)
             return False
         
         # Step 3: Analyze historical positions to continue where we left off
-        print(f"\n🎯 Step 3: Analyzing historical positions (emails suppressed)...")
+        logger.info("\n🎯 Step 3: Analyzing historical positions (emails suppressed)...")
         historical_analysis = self.position_tracker.analyze_historical_positions(symbol, suppress_emails=True)
         
         # Step 4: Summary
-        print(f"\n🔄 Bootstrap Summary for {symbol}_{frequency}:")
-        print(f"   Data Fetch: {'✅ Success' if fetch_success else '❌ Failed'}")
-        print(f"   Indicators: {'✅ Success' if indicators_success else '❌ Failed'}")
-        print(f"   Historical Analysis: {'✅ Complete' if historical_analysis else '❌ Failed'}")
-        print(f"   Total Historical Signals: {historical_analysis.get('total_signals', 0)}")
-        print(f"   Position States Ready: ✅ Ready for live trading")
+        logger.info("\n🔄 Bootstrap Summary for %s_%s:\n"
+                    "   Data Fetch: %s\n"
+                    "   Indicators: %s\n"
+                    "   Historical Analysis: %s\n"
+                    "   Total Historical Signals: %s\n"
+                    "   Position States Ready: ✅ Ready for live trading",
+                    symbol, frequency,
+                    '✅ Success' if fetch_success else '❌ Failed',
+                    '✅ Success' if indicators_success else '❌ Failed',
+                    '✅ Complete' if historical_analysis else '❌ Failed',
+                    historical_analysis.get('total_signals', 0))
         
         return True
 
+    def run_bootstrap_all(self, symbol: str, frequencies: List[str]) -> bool:
+        """
+        Bootstrap several frequencies at once, then analyze historical positions once
+        
+        Args:
+            symbol: Stock symbol
+            frequencies: Data frequencies to bootstrap
+            
+        Returns:
+            True if every frequency bootstrapped successfully, False otherwise
+        """
+        return asyncio.run(self.run_bootstrap_all_async(symbol, frequencies))
+
+    async def run_bootstrap_all_async(self, symbol: str, frequencies: List[str]) -> bool:
+        """
+        Async multi-frequency bootstrap: historical fetches run concurrently over
+        the shared HTTP session and indicator calculation runs in worker processes
+        
+        Args:
+            symbol: Stock symbol
+            frequencies: Data frequencies to bootstrap
+            
+        Returns:
+            True if every frequency bootstrapped successfully, False otherwise
+        """
+        logger.info("\n🔄 Bootstrap Mode: Historical data + position analysis for %s @ %s\n%s",
+                    symbol, ', '.join(frequencies), BANNER_75)
+        
+        # Step 1: Fetch bootstrap data for every frequency concurrently
+        logger.info("📡 Step 1: Fetching bootstrap data...")
+        data_fetcher = self.data_fetcher
+        fetched = await asyncio.gather(*[
+            asyncio.to_thread(data_fetcher.fetch_bootstrap_data, symbol, frequency)
+            for frequency in frequencies
+        ])
+        fetch_results: Dict[str, bool] = dict(zip(frequencies, fetched))
+        
+        for frequency, fetch_success in fetch_results.items():
+            if not fetch_success:
+                logger.error("❌ Bootstrap data fetch failed for %s_%s", symbol, frequency)
+        
+        # Step 2: Calculate indicators (CPU-bound) in parallel worker processes
+        logger.info("\n📈 Step 2: Calculating indicators...")
+        ready = [frequency for frequency in frequencies if fetch_results[frequency]]
+        indicator_results: Dict[str, bool] = dict.fromkeys(frequencies, False)
+        if ready:
+            loop = asyncio.get_running_loop()
+            with ProcessPoolExecutor(max_workers=len(ready)) as pool:
+                calculated = await asyncio.gather(*[
+                    loop.run_in_executor(pool, _calculate_indicators, symbol, frequency)
+                    for frequency in ready
+                ])
+            indicator_results.update(zip(ready, calculated))
+        
+        for frequency in ready:
+            if not indicator_results[frequency]:
+                logger.error("❌ Failed to calculate indicators for %s_%s", symbol, frequency)
+        
+        # Step 3: Analyze historical positions once; it covers every timeframe
+        logger.info("\n🎯 Step 3: Analyzing historical positions (emails suppressed)...")
+        historical_analysis = self.position_tracker.analyze_historical_positions(symbol, suppress_emails=True)
+        
+        # Step 4: Summary
+        lines = [f"\n🔄 Bootstrap Summary for {symbol}:"]
+        for frequency in frequencies:
+            lines.append(f"   {frequency}: Data Fetch {'✅' if fetch_results[frequency] else '❌'} | "
+                         f"Indicators {'✅' if indicator_results[frequency] else '❌'}")
+        lines.append(f"   Historical Analysis: {'✅ Complete' if historical_analysis else '❌ Failed'}")
+        lines.append(f"   Total Historical Signals: {historical_analysis.get('total_signals', 0)}")
+        logger.info("\n".join(lines))
+        
+        return all(fetch_results.values()) and all(indicator_results.values())
+
     def run_analysis_only(self, symbol: str, frequency: str) -> bool:
         """
         Run position analysis only for a specific frequency
@@ -201,8 +432,8 @@ class ScheduledCoordinator:
         Returns:
             True if successful, False otherwise
         """
-        print(f"\n🎯 Analysis Mode: {symbol}_{frequency}")
-        print("=" * 40)
+        logger.info("\n🎯 Analysis Mode: %s_%s", symbol, frequency)
+        logger.info(BANNER_40)
         
         try:
             # Check for position signals
@@ -210,65 +441,214 @@ class ScheduledCoordinator:
             
             # Process signals
             signals_found = False
+            pending = []
             
-            long_signal = period_signals['LONG']
-            if long_signal['action']:
+            long_signal = period_signals.long
+            if long_signal.action:
                 signals_found = True
-                self.position_tracker._send_position_notification(symbol, frequency, 'LONG', long_signal)
-                print(f"🚨 LONG {long_signal['action']} signal: ${long_signal['price']}")
+                pending.append((frequency, 'LONG', long_signal))
+                logger.info("🚨 LONG %s signal: $%s", long_signal.action, long_signal.price)
             
-            short_signal = period_signals['SHORT']
-            if short_signal['action']:
+            short_signal = period_signals.short
+            if short_signal.action:
                 signals_found = True
-                self.position_tracker._send_position_notification(symbol, frequency, 'SHORT', short_signal)
-                print(f"🚨 SHORT {short_signal['action']} signal: ${short_signal['price']}")
+                pending.append((frequency, 'SHORT', short_signal))
+                logger.info("🚨 SHORT %s signal: $%s", short_signal.action, short_signal.price)
+            
+            # Notify LONG and SHORT changes over a single SMTP session
+            positions = self.position_tracker.send_position_notifications(symbol, pending)
             
             if not signals_found:
-                print(f"📊 No position signals for {symbol}_{frequency}")
+                logger.info("📊 No position signals for %s_%s", symbol, frequency)
             
             # Show position status
-            positions = self.position_tracker.get_position_status()
-            print(f"📊 Current {frequency} Position: {positions.get(frequency, 'N/A')}")
+            logger.info("📊 Current %s Position: %s", frequency, positions.get(frequency, 'N/A'))
             
             return True
             
         except Exception as e:
-            print(f"❌ Analysis failed: {e}")
+            logger.error("❌ Analysis failed: %s", e)
             return False
 
+    def next_run_time(self, frequency: str, now: Optional[datetime] = None) -> datetime:
+        """
+        Get the next bar boundary (plus fetch delay) for a frequency, aligned
+        to market open and skipping weekends
+        
+        Args:
+            frequency: Data frequency ('5m', '10m', '15m', '30m')
+            now: Current ET datetime (defaults to now)
+            
+        Returns:
+            Timezone-aware ET datetime of the next scheduled run
+        """
+        if now is None:
+            now = datetime.now(ET_TIMEZONE)
+        interval = int(frequency[:-1]) * 60
+        
+        day = now.date()
+        elapsed = now.hour * 3600 + now.minute * 60 + now.second - MARKET_OPEN_S - DAEMON_FETCH_DELAY_S
+        target_s = MARKET_OPEN_S + max(elapsed // interval + 1, 0) * interval
+        
+        if target_s > MARKET_CLOSE_S or day.weekday() >= 5:
+            day += timedelta(days=1)
+            while day.weekday() >= 5:
+                day += timedelta(days=1)
+            target_s = MARKET_OPEN_S
+        
+        return datetime.combine(day, time(), tzinfo=ET_TIMEZONE) + timedelta(seconds=target_s + DAEMON_FETCH_DELAY_S)
 
-def main():
-    """Main function for scheduled execution"""
-    parser = argparse.ArgumentParser(description='Scheduled Market Data Coordinator')
-    parser.add_argument('symbol', help='Stock symbol (e.g., SPY)')
-    parser.add_argument('frequency', choices=['5m', '10m', '15m', '30m'], 
-                       help='Data frequency')
-    parser.add_argument('--mode', choices=['scheduled', 'bootstrap', 'analysis'], 
-                       default='scheduled', help='Execution mode (scheduled is recommended for cron jobs)')
+    def _schedule_next(self, scheduler: sched.scheduler, symbol: str, frequency: str):
+        """Queue the next scheduled execution for a frequency"""
+        run_at = self.next_run_time(frequency)
+        # Shorter frequencies run first when boundaries coincide
+        scheduler.enterabs(run_at.timestamp(), int(frequency[:-1]), self._daemon_tick,
+                           (scheduler, symbol, frequency))
+
+    def _daemon_tick(self, scheduler: sched.scheduler, symbol: str, frequency: str):
+        """Run one scheduled execution and queue the next one"""
+        try:
+            self.run_scheduled_execution(symbol, frequency)
+        except Exception as e:
+            logger.error("❌ Error during %s daemon tick: %s", frequency, e)
+        finally:
+            sys.stdout.flush()
+            self._event_log.flush()
+            self._schedule_next(scheduler, symbol, frequency)
+
+    def run_daemon(self, symbol: str, frequencies: List[str]) -> bool:
+        """
+        Run scheduled executions in-process at each bar boundary, keeping
+        components, HTTP connections and caches warm between ticks
+        
+        Args:
+            symbol: Stock symbol
+            frequencies: Data frequencies to schedule
+            
+        Returns:
+            True when the daemon is stopped cleanly
+        """
+        scheduler = sched.scheduler(time_module.time, time_module.sleep)
+        for frequency in frequencies:
+            self._schedule_next(scheduler, symbol, frequency)
+        
+        logger.info("\n🔁 Daemon Mode: %s @ %s", symbol, ', '.join(frequencies))
+        for event in scheduler.queue:
+            logger.info("   Next %s run: %s ET", event.argument[2],
+                        datetime.fromtimestamp(event.time, ET_TIMEZONE).strftime('%Y-%m-%d %H:%M:%S'))
+        
+        # Structured per-stage events, buffered and flushed once per tick
+        os.makedirs(EVENT_LOG_DIR, exist_ok=True)
+        event_log_path = os.path.join(EVENT_LOG_DIR, f"{symbol}_events.jsonl")
+        self._event_log = open(event_log_path, 'ab', buffering=65536)
+        logger.info("📝 Event log: %s", event_log_path)
+        sys.stdout.flush()
+        
+        # Wait on an event instead of sleeping in the scheduler, so SIGTERM stops the daemon immediately
+        stop_event = threading.Event()
+        previous_sigterm = signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+        try:
+            while not stop_event.is_set():
+                delay = scheduler.run(blocking=False)
+                if delay is None:
+                    break
+                stop_event.wait(delay)
+            logger.info("\n🛑 Daemon stopped")
+        except KeyboardInterrupt:
+            logger.info("\n🛑 Daemon stopped")
+        finally:
+            signal.signal(signal.SIGTERM, previous_sigterm)
+            self._event_log.close()
+            self._event_log = None
+            self.close()
+        
+        return True
+
+
+class BufferedStreamHandler(logging.StreamHandler):
+    """StreamHandler that leaves flushing to the stream's own buffer"""
     
-    args = parser.parse_args()
+    def flush(self):
+        pass
+
+
+def setup_cli_logging() -> logging.Handler:
+    """
+    Send coordinator output to block-buffered stdout so a run is written in
+    a single flush instead of one write per line
     
-    coordinator = ScheduledCoordinator()
+    Returns:
+        The installed handler
+    """
+    # Component modules still print to stdout; sharing its buffer keeps ordering
+    sys.stdout.reconfigure(line_buffering=False)
+    handler = BufferedStreamHandler(sys.stdout)
+    handler.setFormatter(logging.Formatter('%(message)s'))
     
-    print(f"🚀 Scheduled Market Data Coordinator")
-    print(f"📊 Mode: {args.mode.upper()}")
-    print(f"📊 Symbol: {args.symbol}")
-    print(f"📊 Frequency: {args.frequency}")
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+    return handler
+
+
+# Command-line parser, built once at import
+_PARSER = argparse.ArgumentParser(description='Scheduled Market Data Coordinator')
+_PARSER.add_argument('symbol', help='Stock symbol (e.g., SPY)')
+_PARSER.add_argument('frequency', nargs='?', choices=FREQUENCIES, 
+                     help='Data frequency (all frequencies when omitted with --daemon)')
+_PARSER.add_argument('--mode', choices=['scheduled', 'bootstrap', 'analysis'], 
+                     default='scheduled', help='Execution mode (scheduled is recommended for cron jobs)')
+_PARSER.add_argument('--daemon', action='store_true',
+                     help='Stay resident and run scheduled executions at each bar boundary instead of via cron')
+_PARSER.add_argument('--frequencies', nargs='+', choices=FREQUENCIES,
+                     help='Bootstrap several frequencies concurrently (bootstrap mode only)')
+
+
+def main():
+    """Main function for scheduled execution"""
+    args = _PARSER.parse_args()
+    if args.daemon and args.mode != 'scheduled':
+        _PARSER.error('--daemon only supports scheduled mode')
+    if args.frequencies and args.mode != 'bootstrap':
+        _PARSER.error('--frequencies only supports bootstrap mode')
+    if not args.daemon and args.frequency is None and not args.frequencies:
+        _PARSER.error('frequency is required unless --daemon or --frequencies is set')
     
-    # For cron jobs, always use scheduled mode (complete workflow)
-    if args.mode == 'scheduled':
-        success = coordinator.run_scheduled_execution(args.symbol, args.frequency)
-    elif args.mode == 'bootstrap':
-        success = coordinator.run_bootstrap(args.symbol, args.frequency)
-    elif args.mode == 'analysis':
-        success = coordinator.run_analysis_only(args.symbol, args.frequency)
+    setup_cli_logging()
+    
+    try:
+        # Off-hours cron ticks exit before any component is configured or built
+        if args.mode == 'scheduled' and not args.daemon and not is_market_open(datetime.now(ET_TIMEZONE)):
+            logger.info("🕒 Market closed. Skipping execution.")
+            return
+        
+        coordinator = ScheduledCoordinator()
+        
+        logger.info("🚀 Scheduled Market Data Coordinator\n📊 Mode: %s\n📊 Symbol: %s\n📊 Frequency: %s",
+                    args.mode.upper(), args.symbol,
+                    ', '.join(args.frequencies) if args.frequencies else args.frequency or 'all')
+        
+        if args.daemon:
+            frequencies = [args.frequency] if args.frequency else FREQUENCIES
+            success = coordinator.run_daemon(args.symbol, frequencies)
+        # For cron jobs, always use scheduled mode (complete workflow)
+        elif args.mode == 'scheduled':
+            success = coordinator.run_scheduled_execution(args.symbol, args.frequency)
+        elif args.mode == 'bootstrap' and args.frequencies:
+            success = coordinator.run_bootstrap_all(args.symbol, args.frequencies)
+        elif args.mode == 'bootstrap':
+            success = coordinator.run_bootstrap(args.symbol, args.frequency)
+        elif args.mode == 'analysis':
+            success = coordinator.run_analysis_only(args.symbol, args.frequency)
+        
+        if success:
+            logger.info("\n✅ %s execution completed successfully", args.mode.title())
+        else:
+            logger.error("\n❌ %s execution failed", args.mode.title())
+    finally:
+        sys.stdout.flush()
     
-    if success:
-        print(f"\n✅ {args.mode.title()} execution completed successfully")
-        sys.exit(0)
-    else:
-        print(f"\n❌ {args.mode.title()} execution failed")
-        sys.exit(1)
+    sys.exit(0 if success else 1)
 
 
 if __name__ == "__main__":
@@ -5,35 +5,96 @@ Handles all authentication, token management, and API credential functionality
 """
 
 import os
-import json
 import base64
+import orjson
 import requests
+import threading
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 import time as time_module
 from datetime import datetime, timedelta
 from typing import Optional, Tuple
 
+from config import Config
+from file_utils import write_file_atomic
+
+
+def create_http_session() -> requests.Session:
+    """
+    Create a keep-alive HTTP session with pooled connections, JSON Accept
+    header and retries of GETs on transient errors, for sharing between API clients
+    
+    Returns:
+        Configured requests Session
+    """
+    session = requests.Session()
+    session.headers.update({'Accept': 'application/json'})
+    retry = Retry(total=5, backoff_factor=0.5,
+                  status_forcelist=[429, 500, 502, 503, 504],
+                  # Token POSTs are not idempotent; refresh_access_token handles its own failures
+                  allowed_methods=frozenset(['GET']),
+                  respect_retry_after_header=True,  # Wait as long as a 429/503 asks
+                  raise_on_status=False)  # Hand the final response back to the callers' status handling
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16, max_retries=retry)
+    session.mount('https://', adapter)
+    return session
+
+
 class SchwabAuth:
-    def __init__(self):
+    def __init__(self, config: Optional[Config] = None, session: Optional[requests.Session] = None):
+        self.config = config or Config.load()
+        self.session = session or create_http_session()
         self.last_token_refresh = None
         self.token_refresh_interval = 20 * 60  # 20 minutes in seconds
         
-    def load_credentials(self) -> Tuple[Optional[str], Optional[str]]:
-        """Load Schwab API credentials from environment file"""
-        credentials_file = 'schwab_credentials.env'
+        # Serializes token checks/refreshes when callers run concurrently
+        self._token_lock = threading.Lock()
         
-        if os.path.exists(credentials_file):
-            try:
-                with open(credentials_file, 'r') as f:
-                    for line in f:
-                        line = line.strip()
-                        if line and not line.startswith('#') and '=' in line:
-                            key, value = line.split('=', 1)
-                            os.environ[key.strip()] = value.strip()
-            except Exception as e:
-                print(f"⚠️  Error loading credentials file: {e}")
+        # Trust a token refreshed by an earlier process instead of forcing a refresh on cold start
+        self.last_token_refresh = self._saved_token_created_at()
         
-        app_key = os.getenv('SCHWAB_APP_KEY')
-        app_secret = os.getenv('SCHWAB_APP_SECRET')
+        # Token held in memory, valid until a monotonic deadline (immune to wall-clock jumps)
+        self._cached_token: Optional[str] = None
+        self._cached_token_valid_until = 0.0
+        
+        # Token-exchange headers (Basic client credentials), built on first refresh
+        self._token_headers: Optional[dict] = None
+        
+        # Bearer headers for API requests, rebuilt only when the token changes
+        self._auth_headers: dict = {}
+        self._auth_headers_token: Optional[str] = None
+    
+    def _get_token_headers(self) -> Optional[dict]:
+        """Get the token endpoint headers, encoding the client credentials only once"""
+        if self._token_headers is None:
+            app_key, app_secret = self.load_credentials()
+            if not app_key or not app_secret:
+                return None
+            encoded_credentials = base64.b64encode(f"{app_key}:{app_secret}".encode()).decode()
+            self._token_headers = {
+                'Authorization': f'Basic {encoded_credentials}',
+                'Content-Type': 'application/x-www-form-urlencoded'
+            }
+        return self._token_headers
+    
+    def _remember_token(self, access_token: str, seconds_remaining: float):
+        """Keep the token in memory until 5 minutes before it expires"""
+        self._cached_token = access_token
+        self._cached_token_valid_until = time_module.monotonic() + seconds_remaining - 5 * 60
+    
+    def _saved_token_created_at(self) -> Optional[float]:
+        """Get the saved access token's creation time as epoch seconds, if available"""
+        try:
+            with open('schwab_access_token.txt', 'r') as f:
+                token_data = orjson.loads(f.read())
+            return datetime.fromisoformat(token_data['created_at']).timestamp()
+        except (FileNotFoundError, KeyError, ValueError, TypeError):
+            return None
+        
+    def load_credentials(self) -> Tuple[Optional[str], Optional[str]]:
+        """Get Schwab API credentials from the shared configuration"""
+        app_key = self.config.schwab_app_key
+        app_secret = self.config.schwab_app_secret
         
         if not app_key or not app_secret:
             print("❌ Missing SCHWAB_APP_KEY or SCHWAB_APP_SECRET")
@@ -45,7 +106,7 @@ class SchwabAuth:
         """Check if current access token is still valid"""
         try:
             with open('schwab_access_token.txt', 'r') as f:
-                token_data = json.load(f)
+                token_data = orjson.loads(f.read())
             
             expires_at = datetime.fromisoformat(token_data['expires_at'])
             # Consider token expired if it expires within 5 minutes
@@ -66,40 +127,61 @@ class SchwabAuth:
 
     def get_access_token(self) -> Optional[str]:
         """Get current access token, refresh if needed"""
-        try:
-            # Check if we should proactively refresh
-            if self.should_refresh_token_proactively():
-                print("🕒 Proactive token refresh (20-minute interval)")
-                if self.refresh_access_token():
-                    self.last_token_refresh = time_module.time()
-                else:
-                    print("⚠️  Proactive token refresh failed")
+        with self._token_lock:
+            # Fast path: no file read while the in-memory token is fresh
+            if (self._cached_token and time_module.monotonic() < self._cached_token_valid_until
+                    and not self.should_refresh_token_proactively()):
+                return self._cached_token
             
-            # Check if token is still valid
-            if not self.is_token_valid():
-                print("🔄 Access token expired, refreshing...")
-                if self.refresh_access_token():
-                    self.last_token_refresh = time_module.time()
-                else:
-                    return None
-            
-            with open('schwab_access_token.txt', 'r') as f:
-                token_data = json.load(f)
-            return token_data['access_token']
+            try:
+                # Check if we should proactively refresh
+                if self.should_refresh_token_proactively():
+                    print("🕒 Proactive token refresh (20-minute interval)")
+                    if self.refresh_access_token():
+                        self.last_token_refresh = time_module.time()
+                    else:
+                        print("⚠️  Proactive token refresh failed")
                 
-        except FileNotFoundError:
-            print("❌ Access token file not found")
-            return None
-        except Exception as e:
-            print(f"❌ Error loading access token: {e}")
-            return None
+                # Check if token is still valid
+                if not self.is_token_valid():
+                    print("🔄 Access token expired, refreshing...")
+                    if self.refresh_access_token():
+                        self.last_token_refresh = time_module.time()
+                    else:
+                        return None
+                
+                with open('schwab_access_token.txt', 'r') as f:
+                    token_data = orjson.loads(f.read())
+                expires_at = datetime.fromisoformat(token_data['expires_at'])
+                self._remember_token(token_data['access_token'], (expires_at - datetime.now()).total_seconds())
+                return token_data['access_token']
+                    
+            except FileNotFoundError:
+                print("❌ Access token file not found")
+                return None
+            except Exception as e:
+                print(f"❌ Error loading access token: {e}")
+                return None
+
+    def force_refresh(self) -> Optional[str]:
+        """
+        Refresh the access token now, e.g. after the API rejected it with 401
+        
+        Returns:
+            The new access token, or None if the refresh failed
+        """
+        with self._token_lock:
+            if not self.refresh_access_token():
+                return None
+            self.last_token_refresh = time_module.time()
+        return self.get_access_token()
 
     def refresh_access_token(self) -> bool:
         """Refresh the access token using refresh token"""
         print("🔄 Refreshing access token...")
         
-        app_key, app_secret = self.load_credentials()
-        if not app_key or not app_secret:
+        headers = self._get_token_headers()
+        if headers is None:
             return False
         
         try:
@@ -109,25 +191,17 @@ class SchwabAuth:
             print(f"❌ Failed to load refresh token: {e}")
             return False
         
-        token_url = "https://api.schwabapi.com/v1/oauth/token"
-        credentials = f"{app_key}:{app_secret}"
-        encoded_credentials = base64.b64encode(credentials.encode()).decode()
-        
-        headers = {
-            'Authorization': f'Basic {encoded_credentials}',
-            'Content-Type': 'application/x-www-form-urlencoded'
-        }
-        
+        token_url = f"{self.config.api_base_url}/v1/oauth/token"
         data = {
             'grant_type': 'refresh_token',
             'refresh_token': refresh_token
         }
         
         try:
-            response = requests.post(token_url, headers=headers, data=data)
+            response = self.session.post(token_url, headers=headers, data=data)
             
             if response.status_code == 200:
-                token_data = response.json()
+                token_data = orjson.loads(response.content)
                 current_time = datetime.now()
                 expires_in = token_data.get('expires_in', 1800)
                 expires_at = current_time.timestamp() + expires_in
@@ -139,12 +213,12 @@ class SchwabAuth:
                     'expires_in': expires_in
                 }
                 
-                with open('schwab_access_token.txt', 'w') as f:
-                    json.dump(token_info, f)
+                # Atomic so a crash mid-write cannot leave a corrupt token file behind
+                write_file_atomic('schwab_access_token.txt', orjson.dumps(token_info).decode())
+                self._remember_token(token_info['access_token'], expires_in)
                 
                 if 'refresh_token' in token_data:
-                    with open('schwab_refresh_token.txt', 'w') as f:
-                        f.write(token_data['refresh_token'])
+                    write_file_atomic('schwab_refresh_token.txt', token_data['refresh_token'])
                 
                 print("✅ Access token refreshed successfully")
                 return True
@@ -161,7 +235,7 @@ class SchwabAuth:
         """Get information about current token status"""
         try:
             with open('schwab_access_token.txt', 'r') as f:
-                token_data = json.load(f)
+                token_data = orjson.loads(f.read())
             
             expires_at = datetime.fromisoformat(token_data['expires_at'])
             current_time = datetime.now()
@@ -248,10 +322,15 @@ class SchwabAuth:
         if not access_token:
             return {}
         
-        return {
-            'Authorization': f'Bearer {access_token}',
-            'Accept': 'application/json'
-        }
+        # Accept is a default header on the shared session; callers must not mutate the dict
+        if access_token != self._auth_headers_token:
+            self._auth_headers = {'Authorization': f'Bearer {access_token}'}
+            self._auth_headers_token = access_token
+        return self._auth_headers
+
+    def close(self):
+        """Close the HTTP session and its pooled connections"""
+        self.session.close()
 
     def is_authenticated(self) -> bool:
         """Check if we have valid authentication"""